@@ -0,0 +1,148 @@
+"""Benchmark pipeline riset headless terhadap stand-in lokal (fake_api.py), tanpa kuota sungguhan.
+
+Tahap yang diukur per ukuran hasil: search (search_multilang_union) → detail (yt_videos_detail) →
+sort (collapse_duplicates + term_index + filter + apply_client_sort) → niche (render_niche_summary + judul + tag) [→ ai (ai_task_many)].
+Per tahap dilaporkan waktu wall, jumlah request ke stand-in, byte respons yang dikirim stand-in (setelah
+gzip/`fields`), dan puncak memori (tracemalloc).
+Tiap ukuran dijalankan di subprocess sendiri dengan cache SQLite baru (cold), opsional diulang (warm).
+
+    python bench_pipeline.py                                  # 10, 100, 1000, 10000 video
+    python bench_pipeline.py --sizes 100 1000 --latency 50 --jitter 30 --error-rate 0.01 --warm
+    python bench_pipeline.py --ai 40 --json > bench.json
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+STAGES = ("search", "detail", "sort", "niche", "ai")
+
+def run_pipeline(core, srv, n, keyword, sort_option, ai_videos, trace):
+    """Satu putaran semua tahap; kembalikan {tahap: {ms, requests, kb, peak_mb}}, jumlah video, dan error.
+    peak_mb = puncak memori Python selama tahap itu (termasuk modul yang sudah ter-import)."""
+    out, ctx = {}, {}
+    jobs = core.search_jobs(keyword)
+    pages = max(1, math.ceil(n * 1.25 / (max(1, len(jobs)) * core.SEARCH_PAGE_SIZE)))
+    order = core.map_sort_option(sort_option)
+    errors = []
+
+    def stage(name, fn):
+        before = srv.stats()
+        if trace: tracemalloc.reset_peak()
+        t = time.perf_counter()
+        ctx[name] = fn()
+        ms = (time.perf_counter() - t) * 1000
+        after = srv.stats()
+        reqs = sum(after.get(k, 0) - before.get(k, 0) for k in ("search", "videos", "videos.chart", "gemini"))
+        out[name] = {"ms": round(ms, 2), "requests": reqs, "kb": round((after.get("bytes_out", 0) - before.get("bytes_out", 0)) / 1024, 1),
+                     "peak_mb": round(tracemalloc.get_traced_memory()[1] / 1e6, 2) if trace else None}
+        return ctx[name]
+
+    ids = stage("search", lambda: core.search_multilang_union("bench", keyword, order, core.SEARCH_PAGE_SIZE, "Semua",
+                                                               errors=errors, max_pages=pages, cap=n))
+    videos = stage("detail", lambda: core.yt_videos_detail("bench", ids, errors=errors))
+    def sort():
+        collapsed = core.collapse_duplicates(videos)
+        core.term_index(collapsed)
+        return core.apply_client_sort(core.filter_by_video_type(collapsed, "Semua"), sort_option, keyword)
+    videos = stage("sort", sort)
+    stage("niche", lambda: (core.render_niche_summary(videos, keyword), core.generate_titles_from_data(videos, sort_option),
+                            core.global_tag_string(videos)))
+    if ai_videos:
+        status = {}
+        stage("ai", lambda: core.ai_task_many(videos[:ai_videos], "summary", api_key="bench", status=status))
+        if status.get("gemini_last_error"): errors.append(f"gemini: {status['gemini_last_error']}")
+    return out, len(videos), errors
+
+def child(args):
+    import fake_api
+    srv = fake_api.start(latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate, overlap=args.overlap)
+    # env harus di-set sebelum import yt_core (URL & path DB dibaca saat import)
+    os.environ["YT_API_BASE"], os.environ["GEMINI_API_BASE"] = srv.yt_base, srv.base_url
+    os.environ["YT_CACHE_DB"] = os.path.join(tempfile.mkdtemp(prefix="ytbench"), "cache.sqlite3")
+    if args.trace: tracemalloc.start()
+    t = time.perf_counter()
+    import yt_core as core
+    import_ms = (time.perf_counter() - t) * 1000
+    base_mb = tracemalloc.get_traced_memory()[0] / 1e6 if args.trace else 0.0
+    ai = args.ai
+    if ai:
+        import importlib.util
+        if importlib.util.find_spec("google.generativeai") is None: ai = 0
+    report = {"size": args.size, "import_ms": round(import_ms, 2), "base_mb": round(base_mb, 2), "ai_skipped": bool(args.ai and not ai)}
+    report["cold"], report["videos"], report["errors"] = run_pipeline(core, srv, args.size, args.keyword, args.sort, ai, args.trace)
+    if args.warm:
+        report["warm"], _, _ = run_pipeline(core, srv, args.size, args.keyword, args.sort, ai, args.trace)
+    if args.trace: report["peak_mb"] = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+    try:
+        import resource
+        report["max_rss_mb"] = round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+    except ImportError:
+        pass
+    report["requests_total"] = srv.stats()
+    srv.shutdown()
+    print(json.dumps(report))
+    return 0
+
+def print_table(reports):
+    for r in reports:
+        print(f"\n== {r['size']} video diminta → {r['videos']} didapat (import {r['import_ms']:.0f} ms"
+              + (f", puncak tracemalloc {r['peak_mb']} MB dari basis {r['base_mb']} MB" if r.get("peak_mb") is not None else "")
+              + (f", RSS {r['max_rss_mb']} MB" if "max_rss_mb" in r else "") + ")")
+        for run in ("cold", "warm"):
+            if run not in r: continue
+            print(f"  {run:<5} {'tahap':<8}{'ms':>10}{'request':>9}{'KB':>10}{'peak MB':>9}")
+            for s in STAGES:
+                if s in r[run]:
+                    x = r[run][s]
+                    peak = "-" if x["peak_mb"] is None else f"{x['peak_mb']:.1f}"
+                    print(f"        {s:<8}{x['ms']:>10.1f}{x['requests']:>9}{x.get('kb', 0):>10.1f}{peak:>9}")
+        if r["errors"]:
+            print(f"  ⚠️ {len(r['errors'])} error (mis. {r['errors'][0]})")
+        if r["ai_skipped"]:
+            print("  (tahap ai dilewati: google-generativeai tidak terpasang)")
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark pipeline riset headless terhadap stand-in API lokal.")
+    ap.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000, 10000], help="jumlah video target (cap union)")
+    ap.add_argument("--keyword", default="flute tibet")
+    ap.add_argument("--sort", default="VPH Tertinggi")
+    ap.add_argument("--latency", type=float, default=0.0, help="latensi stand-in per request (ms)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="jitter latensi acak (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 500 dari stand-in")
+    ap.add_argument("--overlap", type=float, default=0.1, help="porsi hasil search yang duplikat lintas varian")
+    ap.add_argument("--ai", type=int, default=0, help="jumlah video untuk tahap ai_task_many (0 = lewati)")
+    ap.add_argument("--warm", action="store_true", help="ulangi pipeline dengan cache terisi")
+    ap.add_argument("--no-trace", dest="trace", action="store_false", help="tanpa tracemalloc (waktu lebih akurat)")
+    ap.add_argument("--json", action="store_true", help="cetak hasil sebagai JSON")
+    ap.add_argument("--_size", dest="size", type=int, help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+    if args.size:
+        return child(args)
+
+    reports = []
+    for n in args.sizes:
+        cmd = [sys.executable, os.path.abspath(__file__), "--_size", str(n), "--keyword", args.keyword, "--sort", args.sort,
+               "--latency", str(args.latency), "--jitter", str(args.jitter), "--error-rate", str(args.error_rate),
+               "--overlap", str(args.overlap), "--ai", str(args.ai)]
+        if args.warm: cmd.append("--warm")
+        if not args.trace: cmd.append("--no-trace")
+        proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True)
+        if proc.returncode:
+            print(proc.stderr, file=sys.stderr)
+            return proc.returncode
+        reports.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+        if not args.json:
+            print_table(reports[-1:])
+    if args.json:
+        print(json.dumps(reports, indent=2))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
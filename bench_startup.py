@@ -0,0 +1,133 @@
+"""Benchmark responsivitas UI: waktu cold start dan waktu eksekusi skrip per rerun Streamlit.
+
+Contoh:
+    python bench_startup.py                       # 5 cold start, 20 rerun, 48 hasil dummy
+    python bench_startup.py --results 0 --json    # tanpa hasil, keluaran JSON (untuk CI)
+    python bench_startup.py --max-cold-ms 400 --max-rerun-ms 150   # exit 1 bila melewati batas
+
+Cold start diukur di subprocess baru (import yt_core + yt_assets, dan run pertama skrip via AppTest).
+Rerun diukur dengan streamlit.testing AppTest tanpa jaringan: hasil pencarian diisi record sintetis.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+APP = os.path.join(HERE, "youtube-analyzer.py")
+HEAVY = ("numpy", "pandas", "google.generativeai")
+
+IMPORT_PROBE = """
+import sys, time, json
+t = time.perf_counter()
+import yt_core, yt_assets
+dt = time.perf_counter() - t
+print(json.dumps({"ms": dt * 1000, "heavy": [m for m in %r if m in sys.modules]}))
+"""
+
+def synthetic_records(n):
+    from yt_core import build_video_record
+    out = []
+    for i in range(n):
+        snip = {"title": f"Tibet flute healing meditation {i}", "channelTitle": f"Channel {i % 7}", "channelId": f"c{i % 7}",
+                "description": "desc " * 40, "publishedAt": f"2024-0{1 + i % 9}-1{i % 9}T0{i % 9}:00:00Z",
+                "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/v{i}/hqdefault.jpg"}}, "liveBroadcastContent": "none"}
+        out.append(build_video_record(f"v{i}", snip, {"viewCount": str(1000 * (i + 1))}, {"duration": f"PT{i % 9}M{i % 60}S"}))
+    return out
+
+def run_app(results, reruns, view_mode):
+    """Dijalankan di subprocess: run pertama (cold) + `reruns` rerun; kembalikan durasi (ms)."""
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60)
+    at.session_state["view_mode"] = view_mode
+    at.session_state["api_key"] = "bench-dummy"  # tanpa key skrip berhenti di st.stop() sebelum hasil dirender
+    t = time.perf_counter(); at.run(); first = (time.perf_counter() - t) * 1000
+    if at.exception:
+        raise RuntimeError([e.message for e in at.exception])
+    if results:
+        at.session_state["last_results"] = synthetic_records(results)
+        at.run()
+        if at.exception:
+            raise RuntimeError([e.message for e in at.exception])
+        # pastikan hasil benar-benar dirender: komponen grid / tombol judul kartu klasik
+        if view_mode == "Grid ringan": rendered = len(at.get("component_instance")) == 1
+        else: rendered = sum(1 for w in at.button if w.key and w.key.startswith("title_btn_")) == results
+        if not rendered:
+            raise RuntimeError(f"hasil tidak dirender ({view_mode}, {results} hasil)")
+    times = []
+    for _ in range(reruns):
+        t = time.perf_counter(); at.run(); times.append((time.perf_counter() - t) * 1000)
+    return {"first_ms": first, "rerun_ms": times}
+
+def percentile(xs, q):
+    xs = sorted(xs)
+    return xs[min(len(xs) - 1, int(round(q * (len(xs) - 1))))] if xs else 0.0
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmark cold start & waktu rerun skrip Streamlit.")
+    ap.add_argument("--cold", type=int, default=5, help="jumlah cold start (subprocess) untuk import inti")
+    ap.add_argument("--reruns", type=int, default=20, help="jumlah rerun yang diukur")
+    ap.add_argument("--results", type=int, default=48, help="jumlah hasil dummy di last_results (0 = halaman kosong)")
+    ap.add_argument("--view-mode", default="Grid ringan", choices=["Grid ringan", "Kartu klasik"])
+    ap.add_argument("--json", action="store_true", help="cetak hasil sebagai JSON")
+    ap.add_argument("--max-cold-ms", type=float, default=0, help="batas median import inti (0 = tanpa batas)")
+    ap.add_argument("--max-rerun-ms", type=float, default=0, help="batas median rerun (0 = tanpa batas)")
+    ap.add_argument("--_app", action="store_true", help=argparse.SUPPRESS)
+    args = ap.parse_args(argv)
+
+    if args._app:
+        print(json.dumps(run_app(args.results, args.reruns, args.view_mode)))
+        return 0
+
+    # cache SQLite terpisah agar benchmark tidak menyentuh cache sungguhan
+    env = dict(os.environ, YT_CACHE_DB=os.path.join(tempfile.mkdtemp(prefix="ytbench"), "cache.sqlite3"))
+    cold, heavy = [], set()
+    for _ in range(max(1, args.cold)):
+        out = subprocess.run([sys.executable, "-c", IMPORT_PROBE % (HEAVY,)], cwd=HERE, env=env,
+                             capture_output=True, text=True, check=True).stdout
+        r = json.loads(out.strip().splitlines()[-1])
+        cold.append(r["ms"]); heavy.update(r["heavy"])
+    t = time.perf_counter()
+    out = subprocess.run([sys.executable, os.path.abspath(__file__), "--_app", "--results", str(args.results),
+                          "--reruns", str(args.reruns), "--view-mode", args.view_mode],
+                         cwd=HERE, env=env, capture_output=True, text=True, check=True).stdout
+    app_wall = (time.perf_counter() - t) * 1000
+    app = json.loads(out.strip().splitlines()[-1])
+    reruns = app["rerun_ms"]
+
+    report = {
+        "import_core_ms": {"median": statistics.median(cold), "min": min(cold), "max": max(cold)},
+        "heavy_loaded_at_import": sorted(heavy),
+        "first_run_ms": app["first_ms"],
+        "app_process_wall_ms": app_wall,
+        "rerun_ms": {"median": statistics.median(reruns) if reruns else 0.0, "p95": percentile(reruns, 0.95),
+                     "min": min(reruns, default=0.0), "n": len(reruns)},
+        "results": args.results, "view_mode": args.view_mode, "python": sys.version.split()[0],
+    }
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import yt_core+yt_assets : median {report['import_core_ms']['median']:.1f} ms "
+              f"(min {report['import_core_ms']['min']:.1f}, max {report['import_core_ms']['max']:.1f})")
+        print(f"modul berat saat import  : {', '.join(report['heavy_loaded_at_import']) or '-'}")
+        print(f"run pertama skrip        : {report['first_run_ms']:.1f} ms (proses total {app_wall:.0f} ms)")
+        print(f"rerun ({args.results} hasil, {args.view_mode}): median {report['rerun_ms']['median']:.1f} ms, "
+              f"p95 {report['rerun_ms']['p95']:.1f} ms, n={len(reruns)}")
+
+    failed = []
+    if heavy:
+        failed.append(f"modul berat ter-import saat startup: {', '.join(sorted(heavy))}")
+    if args.max_cold_ms and report["import_core_ms"]["median"] > args.max_cold_ms:
+        failed.append(f"import inti {report['import_core_ms']['median']:.1f} ms > {args.max_cold_ms} ms")
+    if args.max_rerun_ms and report["rerun_ms"]["median"] > args.max_rerun_ms:
+        failed.append(f"rerun {report['rerun_ms']['median']:.1f} ms > {args.max_rerun_ms} ms")
+    for f in failed:
+        print(f"❌ {f}", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,331 @@
+"""Stand-in HTTP lokal untuk YouTube Data API v3 (search, videos, chart=mostPopular) dan Gemini generateContent.
+
+Data sintetis deterministik (berdasarkan hash ID/query) atau fixture rekaman, dengan latensi dan
+tingkat error yang bisa diatur. Dipakai benchmark (bench_pipeline.py) agar tidak memakai kuota sungguhan.
+
+    python fake_api.py --port 8765 --latency 80 --jitter 40 --error-rate 0.02
+    YT_API_BASE=http://127.0.0.1:8765/youtube/v3 GEMINI_API_BASE=http://127.0.0.1:8765 streamlit run youtube-analyzer.py
+
+    python fake_api.py --dump-store .yt_cache.sqlite3 fixtures.json   # rekam VideoStore jadi fixture
+    python fake_api.py --fixtures fixtures.json
+
+Format fixture: {"search": {"<q>": [video_id, ...]}, "videos": {"<id>": item videos.list}, "trending": [video_id, ...]}.
+Respons YouTube meniru transport Google: `fields=` (partial response), ETag + If-None-Match → 304, dan gzip
+bila Accept-Encoding dan User-Agent memuat "gzip".
+Endpoint bantu: GET /_stats (jumlah request per endpoint), POST /_reset.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import json
+import random
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+WORDS = ("flute tibet healing meditation sleep relax deep focus study music ambient piano rain night lofi jazz "
+         "chill calm spiritual mantra singing bowl zen yoga nature forest ocean waves morning energy chakra "
+         "instrumental bamboo shakuhachi gamelan sitar harp violin guitar cello drums beats cinematic epic").split()
+POPULAR_POOL = 500  # ID "populer" yang muncul di banyak varian → ada duplikat lintas bahasa seperti aslinya
+
+def _h(*parts) -> int:
+    return int.from_bytes(hashlib.sha1("|".join(map(str, parts)).encode()).digest()[:8], "big")
+
+def _vid(*parts) -> str:
+    return base64.urlsafe_b64encode(hashlib.sha1("|".join(map(str, parts)).encode()).digest())[:11].decode()
+
+def synthetic_video(vid: str, parts=("snippet", "statistics", "contentDetails"), now=None):
+    """Item videos.list sintetis yang stabil untuk `vid` (judul, channel, durasi, views, tanggal)."""
+    h = _h(vid)
+    now = now or time.time()
+    words = [WORDS[(h >> (5 * i)) % len(WORDS)] for i in range(4 + h % 5)]
+    age = 3600 + (h % (730 * 24)) * 3600
+    dur = 15 + h % 50 if h % 5 == 0 else 120 + h % 7200
+    it = {"kind": "youtube#video", "etag": _vid("etag", vid), "id": vid}
+    if "snippet" in parts:
+        it["snippet"] = {
+            "publishedAt": datetime.fromtimestamp(now - age, timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "channelId": "UC" + _vid("ch", h % 997), "title": " ".join(words).title(),
+            "description": " ".join(WORDS[(h >> i) % len(WORDS)] for i in range(40)),
+            "thumbnails": {"high": {"url": f"https://i.ytimg.com/vi/{vid}/hqdefault.jpg", "width": 480, "height": 360}},
+            "channelTitle": f"Channel {h % 997}", "liveBroadcastContent": "live" if h % 50 == 0 else "none",
+        }
+    if "contentDetails" in parts:
+        it["contentDetails"] = {"duration": f"PT{dur // 3600}H{dur % 3600 // 60}M{dur % 60}S", "definition": "hd"}
+    if "statistics" in parts:
+        it["statistics"] = {"viewCount": str(h % 5_000_000), "likeCount": str(h % 50_000)}
+    return it
+
+def parse_fields(spec: str) -> dict:
+    """Parser sintaks partial response Google (`a,b/c,d(e,f/g)`) → pohon {kunci: subpohon | None}."""
+    pos = 0
+
+    def parse_list():
+        nonlocal pos
+        tree = {}
+        while pos < len(spec) and spec[pos] != ")":
+            start = pos
+            while pos < len(spec) and spec[pos] not in ",/()": pos += 1
+            name = spec[start:pos].strip()
+            sub = None
+            if pos < len(spec) and spec[pos] == "/":
+                pos += 1
+                sub = parse_path()
+            elif pos < len(spec) and spec[pos] == "(":
+                pos += 1
+                sub = parse_list()
+                pos += 1  # ")"
+            tree[name] = _merge(tree[name], sub) if name in tree else sub
+            if pos < len(spec) and spec[pos] == ",": pos += 1
+        return tree
+
+    def parse_path():
+        nonlocal pos
+        start = pos
+        while pos < len(spec) and spec[pos] not in ",/()": pos += 1
+        name = spec[start:pos].strip()
+        if pos < len(spec) and spec[pos] == "/":
+            pos += 1
+            return {name: parse_path()}
+        if pos < len(spec) and spec[pos] == "(":
+            pos += 1
+            sub = parse_list()
+            pos += 1
+            return {name: sub}
+        return {name: None}
+
+    return parse_list()
+
+def _merge(a, b):
+    """Gabung dua subpohon; None = seluruh properti, jadi menang atas subpohon mana pun."""
+    if a is None or b is None: return None
+    for k, v in b.items():
+        a[k] = _merge(a[k], v) if k in a else v
+    return a
+
+def project(obj, tree):
+    """Terapkan pohon `fields` ke respons (list diproyeksikan per elemen)."""
+    if tree is None: return obj
+    if isinstance(obj, list): return [project(x, tree) for x in obj]
+    if not isinstance(obj, dict): return obj
+    return {k: project(obj[k], sub) for k, sub in tree.items() if k in obj}
+
+def fixtures_from_store(db_path) -> dict:
+    """Ubah tabel VideoStore (video_meta + video_stats) menjadi fixture {"videos": {...}}."""
+    db = sqlite3.connect(db_path)
+    stats = {vid: json.loads(s) for vid, s in db.execute("SELECT id, stats FROM video_stats")}
+    videos = {}
+    for vid, snip, det in db.execute("SELECT id, snippet, details FROM video_meta"):
+        videos[vid] = {"kind": "youtube#video", "id": vid, "snippet": json.loads(snip),
+                       "contentDetails": json.loads(det), "statistics": stats.get(vid, {})}
+    return {"search": {}, "videos": videos, "trending": list(videos)[:50]}
+
+class FakeApiServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, addr, latency_ms=0.0, jitter_ms=0.0, error_rate=0.0, gemini_429_rate=0.0,
+                 max_pages=1000, overlap=0.1, fixtures=None, seed=0):
+        super().__init__(addr, _Handler)
+        self.latency_ms, self.jitter_ms = latency_ms, jitter_ms
+        self.error_rate, self.gemini_429_rate = error_rate, gemini_429_rate
+        self.max_pages, self.overlap = max_pages, overlap
+        self.fixtures = fixtures or {}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.counts = {}
+
+    @property
+    def base_url(self):
+        return f"http://{self.server_address[0]}:{self.server_address[1]}"
+
+    @property
+    def yt_base(self):
+        return self.base_url + "/youtube/v3"
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.counts)
+
+    def reset(self):
+        with self._lock:
+            self.counts.clear()
+
+    def _count(self, key, n=1):
+        with self._lock:
+            self.counts[key] = self.counts.get(key, 0) + n
+
+    def _roll(self):
+        with self._lock:
+            return self._rng.random(), self._rng.uniform(0, self.jitter_ms)
+
+    def delay_and_fail(self, rate):
+        """Tidur sesuai latensi; True bila request ini harus gagal (peluang `rate`)."""
+        p, jitter = self._roll()
+        if self.latency_ms or jitter:
+            time.sleep((self.latency_ms + jitter) / 1000)
+        return p < rate
+
+    # ---------------- YouTube ----------------
+    def search(self, q):
+        query = q.get("q", "")
+        per = min(50, int(q.get("maxResults", 5)))
+        page = int(q.get("pageToken", 0) or 0)
+        fixed = self.fixtures.get("search", {}).get(query)
+        if fixed is not None:
+            ids = fixed[page * per:(page + 1) * per]
+            more = (page + 1) * per < len(fixed)
+        else:
+            seed = "|".join(q.get(k, "") for k in ("q", "order", "regionCode", "relevanceLanguage", "videoDuration", "eventType"))
+            ids = []
+            for i in range(per):
+                h = _h(seed, page, i)
+                ids.append(_vid("pop", h % POPULAR_POOL) if h % 1000 < self.overlap * 1000 else _vid(seed, page, i))
+            more = page + 1 < self.max_pages
+        body = {"kind": "youtube#searchListResponse", "regionCode": q.get("regionCode", "US"),
+                "pageInfo": {"totalResults": 1_000_000, "resultsPerPage": per},
+                "items": [{"kind": "youtube#searchResult", "id": {"kind": "youtube#video", "videoId": v},
+                           "snippet": {"title": synthetic_video(v, ("snippet",))["snippet"]["title"]}} for v in ids]}
+        if more and ids: body["nextPageToken"] = str(page + 1)
+        return body
+
+    def videos(self, q):
+        parts = tuple(p.strip() for p in q.get("part", "snippet").split(","))
+        if q.get("chart") == "mostPopular":
+            n = min(50, int(q.get("maxResults", 5)))
+            ids = self.fixtures.get("trending") or [_vid("trend", q.get("regionCode", "US"), i) for i in range(n)]
+            ids = ids[:n]
+        else:
+            ids = [v for v in q.get("id", "").split(",") if v][:50]
+        fixed = self.fixtures.get("videos", {})
+        items = []
+        for v in ids:
+            it = fixed.get(v) or synthetic_video(v, parts)
+            items.append({k: val for k, val in it.items() if k in ("kind", "etag", "id") or k in parts})
+        return {"kind": "youtube#videoListResponse", "items": items, "pageInfo": {"totalResults": len(items), "resultsPerPage": len(items)}}
+
+    # ---------------- Gemini ----------------
+    def generate(self, model, body):
+        prompt = "\n".join(p.get("text", "") for c in body.get("contents", []) for p in c.get("parts", []))
+        cfg = body.get("generationConfig") or body.get("generation_config") or {}
+        if (cfg.get("responseMimeType") or cfg.get("response_mime_type")) == "application/json":
+            # prompt batch memakai header "### <kunci>" → balas satu nilai per kunci
+            keys = [ln[4:].strip() for ln in prompt.splitlines() if ln.startswith("### ")]
+            text = json.dumps({k: f"[{model}] hasil untuk {k}" for k in keys}, ensure_ascii=False)
+        else:
+            text = f"[{model}] " + " ".join(prompt.split()[:30])
+        return {"candidates": [{"content": {"parts": [{"text": text}], "role": "model"}, "finishReason": "STOP", "index": 0}],
+                "usageMetadata": {"promptTokenCount": len(prompt) // 4, "candidatesTokenCount": len(text) // 4,
+                                  "totalTokenCount": (len(prompt) + len(text)) // 4}}
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, code, body, etag=None):
+        data = json.dumps(body).encode()
+        gz = "gzip" in self.headers.get("Accept-Encoding", "") and "gzip" in self.headers.get("User-Agent", "")
+        if gz: data = gzip.compress(data, 6)
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json; charset=UTF-8")
+        if gz: self.send_header("Content-Encoding", "gzip")
+        if etag: self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+        self.server._count("bytes_out", len(data))
+
+    def _send_api(self, body, fields):
+        """Respons YouTube: etag dihitung dari isi; If-None-Match cocok → 304 tanpa body; `fields` → proyeksi."""
+        etag = '"' + _vid("etag", json.dumps(body, sort_keys=True)) + '"'
+        body = dict(body, etag=etag)
+        if self.headers.get("If-None-Match") == etag:
+            self.server._count("not_modified")
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        self._send(200, project(body, parse_fields(fields)) if fields else body, etag)
+
+    def do_GET(self):
+        srv, url = self.server, urlsplit(self.path)
+        q = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        if url.path == "/_stats":
+            return self._send(200, srv.stats())
+        endpoint = url.path.rsplit("/", 1)[-1]
+        if endpoint not in ("search", "videos"):
+            return self._send(404, {"error": {"code": 404, "message": "Not Found", "errors": [{"reason": "notFound"}]}})
+        name = "videos.chart" if endpoint == "videos" and q.get("chart") else endpoint
+        srv._count(name)
+        if srv.delay_and_fail(srv.error_rate):
+            srv._count("errors")
+            return self._send(500, {"error": {"code": 500, "message": "Backend Error", "errors": [{"reason": "backendError"}]}})
+        self._send_api(srv.search(q) if endpoint == "search" else srv.videos(q), q.get("fields"))
+
+    def do_POST(self):
+        srv, path = self.server, urlsplit(self.path).path
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0) or 0)) or b"{}")
+        if path == "/_reset":
+            srv.reset()
+            return self._send(200, {})
+        if not path.endswith(":generateContent"):
+            return self._send(404, {"error": {"code": 404, "message": "Not Found", "status": "NOT_FOUND"}})
+        model = path.rsplit("/", 1)[-1].split(":")[0]
+        srv._count("gemini")
+        if srv.delay_and_fail(srv.gemini_429_rate):
+            srv._count("gemini_429")
+            return self._send(429, {"error": {"code": 429, "message": "Resource has been exhausted (e.g. check quota).",
+                                              "status": "RESOURCE_EXHAUSTED"}})
+        if srv.delay_and_fail(srv.error_rate):
+            srv._count("errors")
+            return self._send(500, {"error": {"code": 500, "message": "Internal error", "status": "INTERNAL"}})
+        self._send(200, srv.generate(model, body))
+
+def start(host="127.0.0.1", port=0, **cfg) -> FakeApiServer:
+    """Jalankan server di thread daemon; port 0 = port bebas. Hentikan dengan .shutdown()."""
+    srv = FakeApiServer((host, port), **cfg)
+    threading.Thread(target=srv.serve_forever, name="fake-api", daemon=True).start()
+    return srv
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Stand-in lokal YouTube Data API v3 + Gemini untuk benchmark.")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--latency", type=float, default=0.0, help="latensi dasar per request (ms)")
+    ap.add_argument("--jitter", type=float, default=0.0, help="tambahan latensi acak 0..jitter (ms)")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="peluang respons 500 (0..1)")
+    ap.add_argument("--gemini-429-rate", type=float, default=0.0, help="peluang Gemini membalas 429 RESOURCE_EXHAUSTED")
+    ap.add_argument("--max-pages", type=int, default=1000, help="halaman search.list per query sintetis")
+    ap.add_argument("--overlap", type=float, default=0.1, help="porsi hasil search yang diambil dari pool video populer bersama")
+    ap.add_argument("--fixtures", help="file JSON fixture (search/videos/trending)")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--dump-store", nargs=2, metavar=("DB", "OUT"), help="ekspor VideoStore di DB menjadi fixture OUT lalu keluar")
+    args = ap.parse_args(argv)
+    if args.dump_store:
+        fx = fixtures_from_store(args.dump_store[0])
+        with open(args.dump_store[1], "w", encoding="utf-8") as fh:
+            json.dump(fx, fh, ensure_ascii=False)
+        print(f"{len(fx['videos'])} video → {args.dump_store[1]}")
+        return 0
+    fixtures = None
+    if args.fixtures:
+        with open(args.fixtures, encoding="utf-8") as fh:
+            fixtures = json.load(fh)
+    srv = FakeApiServer((args.host, args.port), latency_ms=args.latency, jitter_ms=args.jitter, error_rate=args.error_rate,
+                        gemini_429_rate=args.gemini_429_rate, max_pages=args.max_pages, overlap=args.overlap,
+                        fixtures=fixtures, seed=args.seed)
+    print(f"YT_API_BASE={srv.yt_base}\nGEMINI_API_BASE={srv.base_url}")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# path DB cache dibaca saat import yt_core → set sebelum modul test meng-import-nya
+os.environ.setdefault("YT_CACHE_DB", os.path.join(tempfile.mkdtemp(prefix="yttest"), "cache.sqlite3"))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
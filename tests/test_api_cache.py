@@ -0,0 +1,67 @@
+"""ApiCache: kunci ternormalisasi, TTL, eviction LRU, dan revalidasi ETag di _api_fetch."""
+import time
+import types
+
+import pytest
+
+import yt_core
+from yt_core import ApiCache
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1_700_000_000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    return now
+
+@pytest.fixture
+def cache(tmp_path):
+    return ApiCache(str(tmp_path / "api.sqlite3"), max_entries=3)
+
+def test_key_ignores_api_key_and_query_spacing():
+    a = ApiCache.make_key("u", {"q": "  Flute   Tibet ", "key": "A", "maxResults": 15, "pageToken": None})
+    b = ApiCache.make_key("u", {"maxResults": "15", "q": "flute tibet", "key": "B"})
+    assert a == b
+    assert a != ApiCache.make_key("u", {"q": "flute tibet", "maxResults": 50})
+
+def test_ttl_expiry(cache, clock):
+    cache.set("k", {"v": 1}, ttl=60)
+    assert cache.get("k") == {"v": 1} and cache.has("k")
+    clock[0] += 61
+    assert cache.get("k") is None and not cache.has("k")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_lru_eviction_keeps_recently_used(cache, clock):
+    for k in ("a", "b", "c"):
+        cache.set(k, k, ttl=600); clock[0] += 1
+    assert cache.get("a") == "a"  # a jadi yang terbaru dipakai
+    clock[0] += 1
+    cache.set("d", "d", ttl=600)
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in ("a", "c", "d")] == ["a", "c", "d"]
+
+def test_expired_entries_are_evicted_first(cache, clock):
+    cache.set("old", 1, ttl=1); cache.set("x", 2, ttl=600); cache.set("y", 3, ttl=600)
+    clock[0] += 5
+    cache.set("z", 4, ttl=600)
+    assert cache.stale("old") is None and [cache.get(k) for k in ("x", "y", "z")] == [2, 3, 4]
+
+def test_stale_returns_expired_payload_with_etag(cache, clock):
+    cache.set("k", {"items": [1]}, ttl=60, etag='"e1"')
+    clock[0] += 120
+    assert cache.get("k") is None
+    assert cache.stale("k") == ({"items": [1]}, '"e1"')
+    cache.set("n", {}, ttl=60)
+    assert cache.stale("n") is None  # tanpa ETag tidak bisa direvalidasi
+
+def test_not_modified_reuses_stale_payload(cache, clock, monkeypatch):
+    sent = []
+    def get(url, params=None, headers=None, timeout=None):
+        sent.append(headers)
+        return types.SimpleNamespace(status_code=304, headers={"Content-Length": "0"}, content=b"")
+    monkeypatch.setattr(yt_core, "api_cache", lambda: cache)
+    monkeypatch.setattr(yt_core, "http_session", lambda: types.SimpleNamespace(get=get))
+    cache.set("k", {"items": [1]}, ttl=60, etag='"e1"')
+    clock[0] += 120
+    assert yt_core._api_fetch("http://x/videos", {"key": "test-etag"}, "k", 60, "videos") == {"items": [1]}
+    assert sent == [{"If-None-Match": '"e1"'}]
+    assert cache.get("k") == {"items": [1]}  # masa berlaku diperpanjang
@@ -0,0 +1,41 @@
+"""BM25F: bobot field judul vs deskripsi, token varian leksikon, dan reuse index set penuh untuk subset."""
+import itertools
+
+from yt_core import BM25_VARIANT_WEIGHT, TermIndex, TermIndexCache, bm25_query, build_video_record, relevant_videos
+
+_ids = itertools.count()
+
+def rec(title, desc=""):
+    snip = {"title": title, "channelTitle": "c", "channelId": "c", "description": desc, "publishedAt": "2024-01-01T00:00:00Z"}
+    return build_video_record(f"b{next(_ids)}", snip, {"viewCount": "1"}, {"duration": "PT3M"})
+
+def test_title_match_outranks_description_match():
+    videos = [rec("Ocean Waves", "flute tibet music"), rec("Flute Tibet Music", "ocean waves"), rec("Rain Thunder", "storm")]
+    desc_only, title, none = TermIndex(videos).bm25("flute tibet", videos)
+    assert title > desc_only > 0 and none == 0
+
+def test_relevant_videos_drops_zero_scores_unless_nothing_matches():
+    videos = [rec("Flute Tibet"), rec("Rain Thunder"), rec("Tibet Monastery")]
+    assert relevant_videos(videos, "flute tibet") == [videos[0], videos[2]]
+    assert relevant_videos(videos, "guitar") == videos
+
+def test_variant_terms_are_weighted_below_keyword_terms():
+    assert bm25_query("sáo trúc")[:2] == (("sáo", 1.0), ("trúc", 1.0))
+    assert ("bamboo", BM25_VARIANT_WEIGHT) in bm25_query("sáo trúc")
+    videos = [rec("Sáo Trúc Relax"), rec("Bamboo Flute Relax"), rec("Rain Relax")]
+    original, variant, none = TermIndex(videos).bm25("sáo trúc", videos)
+    assert original > variant > 0 and none == 0
+
+def test_scores_follow_requested_order():
+    videos = [rec("Flute Tibet"), rec("Flute"), rec("Rain")]
+    idx = TermIndex(videos)
+    assert list(idx.bm25("flute tibet", videos[::-1])) == list(idx.bm25("flute tibet", videos))[::-1]
+
+def test_subset_reuses_full_set_index():
+    videos = [rec("Flute Tibet"), rec("Flute Healing"), rec("Tibet Monastery"), rec("Rain")]
+    cache = TermIndexCache()
+    full = cache.get(videos)
+    subset = [videos[2], videos[0]]
+    assert cache.get(subset) is full and len(cache._lru) == 1  # IDF tetap dari seluruh hasil
+    assert list(full.bm25("flute tibet", subset)) == [full.bm25("flute tibet", videos)[i] for i in (2, 0)]
+    assert cache.get([rec("Other")]) is not full
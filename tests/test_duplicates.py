@@ -0,0 +1,69 @@
+"""duplicate_clusters / collapse_duplicates: pasangan duplikat vs bukan, stabil lintas PYTHONHASHSEED."""
+import itertools
+import os
+import subprocess
+import sys
+
+import pytest
+
+from yt_core import build_video_record, collapse_duplicates, duplicate_clusters, with_duplicate_ids
+
+_ids = itertools.count()
+
+def rec(title, channel="c1", seconds=180, views=1000):
+    snip = {"title": title, "channelTitle": channel, "channelId": channel, "publishedAt": "2024-01-01T00:00:00Z"}
+    return build_video_record(f"v{next(_ids)}", snip, {"viewCount": str(views)}, {"duration": f"PT{seconds}S"})
+
+def merged(a, b):
+    return len(duplicate_clusters([a, b])) == 1
+
+@pytest.mark.parametrize("a, b", [
+    ("Tibetan Flute Healing Music for Deep Sleep", "Tibetan Flute Healing Music for Deep Sleep (Official)"),
+    ("Tibetan Flute Healing Music for Deep Sleep", "tibetan flute healing music for deep sleep!!"),
+    ("Relaxing Piano Music 432Hz | Sleep & Study", "Relaxing Piano Music 432Hz - Sleep and Study"),
+])
+def test_reuploads_across_channels_merge(a, b):
+    assert merged(rec(a, "c1"), rec(b, "c2", seconds=182))
+
+@pytest.mark.parametrize("a, b", [
+    ("Tibetan Flute Healing Music for Deep Sleep", "Native American Flute Sleep Music Rain"),  # Jaccard 3-gram ≈ 0.29
+    ("Relaxing Piano Vol 1", "Relaxing Piano Vol 2"),        # angka beda
+    ("Solfeggio 432Hz Deep Sleep", "Solfeggio 528Hz Deep Sleep"),
+])
+def test_same_channel_same_length_distinct_titles_stay_apart(a, b):
+    assert not merged(rec(a), rec(b))
+
+def test_duration_mismatch_stays_apart():
+    title = "Tibetan Singing Bowls Meditation"
+    assert not merged(rec(title, "c1", seconds=600), rec(title, "c2", seconds=3600))
+
+def test_collapse_keeps_most_viewed_and_round_trips_ids():
+    a = rec("Zen Garden Rain Sounds", "c1", views=10)
+    b = rec("Zen Garden Rain Sounds (HD)", "c2", views=500)
+    c = rec("Ocean Waves Night", "c3")
+    out = collapse_duplicates([a, b, c])
+    assert out == [b, c] and b.dupes == (a,) and a.dupes == () and c.dupes == ()
+    assert with_duplicate_ids(out) == [b.id, a.id, c.id]
+
+def test_many_same_length_shorts_stay_bounded():
+    shorts = [rec(f"Calm Flute Short #{i}", "shorts", seconds=58 + i % 3) for i in range(2000)]
+    assert len(duplicate_clusters(shorts)) == len(shorts)  # nomor berbeda → tidak ada yang digabung
+
+SEED_PROBE = """
+import sys; sys.path.insert(0, {root!r})
+from tests.test_duplicates import rec
+from yt_core import duplicate_clusters
+titles = ["Tibetan Flute Healing Music for Deep Sleep", "Native American Flute Sleep Music Rain",
+          "Tibetan Flute Healing Music for Deep Sleep (Official)", "Deep Sleep Flute Music Tibet",
+          "Shamanic Flute Rain Sleep", "Healing Flute Music Deep Sleep Tibetan"] * 3
+print(sorted(map(sorted, duplicate_clusters([rec(t, "c1") for t in titles]))))
+"""
+
+def test_clusters_do_not_depend_on_hash_seed(tmp_path):
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    outs = set()
+    for seed in ("1", "2", "3"):
+        env = dict(os.environ, PYTHONHASHSEED=seed, YT_CACHE_DB=str(tmp_path / f"{seed}.sqlite3"))
+        outs.add(subprocess.run([sys.executable, "-c", SEED_PROBE.format(root=root)], env=env, cwd=root,
+                                capture_output=True, text=True, check=True).stdout.strip().splitlines()[-1])
+    assert len(outs) == 1
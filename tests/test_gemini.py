@@ -0,0 +1,56 @@
+"""Gemini: key per sesi tidak tercampur walau genai.configure global per proses."""
+import sys
+import threading
+import time
+import types
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import yt_core
+
+@pytest.fixture
+def fake_genai(monkeypatch):
+    """Modul google.generativeai tiruan: seperti aslinya, model memakai key global saat dipanggil."""
+    state = {"key": None}
+    mod = types.ModuleType("google.generativeai")
+
+    def configure(api_key, **_):
+        state["key"] = api_key
+
+    class GenerativeModel:
+        def __init__(self, name, generation_config=None):
+            self.name = name
+
+        def generate_content(self, prompt):
+            sent = state["key"]
+            time.sleep(0.002)  # beri kesempatan sesi lain meng-configure di tengah request
+            return types.SimpleNamespace(text=f"{sent}|{state['key']}")
+
+    mod.configure, mod.GenerativeModel = configure, GenerativeModel
+    monkeypatch.setitem(sys.modules, "google", sys.modules.get("google") or types.ModuleType("google"))
+    monkeypatch.setitem(sys.modules, "google.generativeai", mod)
+    monkeypatch.setattr(yt_core, "gemini_limiter", lambda: yt_core.GeminiRateLimiter({"test-model": (10**6, 10**9, 10**9)}))
+    monkeypatch.setattr(yt_core, "genai_gate", lambda gate=yt_core.GenaiKeyGate(): gate)
+    yt_core.gemini_model.cache_clear()
+    yield
+    yt_core.gemini_model.cache_clear()
+
+def test_concurrent_sessions_keep_their_own_key(fake_genai):
+    def call(i):
+        key = f"key-{i % 2}"
+        text, _ = yt_core.gemini_call(key, "test-model", f"prompt {i}", retries=0)
+        return key, text
+
+    with ThreadPoolExecutor(8) as ex:
+        results = list(ex.map(call, range(64)))
+    assert all(text == f"{key}|{key}" for key, text in results)
+
+def test_identical_prompts_are_not_coalesced_across_keys(fake_genai):
+    barrier = threading.Barrier(2)
+    def call(key):
+        barrier.wait()
+        return yt_core.gemini_call(key, "test-model", "same prompt", retries=0)[0]
+    with ThreadPoolExecutor(2) as ex:
+        a, b = ex.map(call, ["key-a", "key-b"])
+    assert a == "key-a|key-a" and b == "key-b|key-b"
@@ -0,0 +1,51 @@
+"""PhraseMatcher / Lexicon / expand_keyword_variants: batas kata, skrip tanpa spasi, overlap, petunjuk bahasa."""
+import pytest
+
+from yt_core import PhraseMatcher, expand_keyword_variants, lexicon, lexicon_norm
+
+def spans(matcher, text):
+    norm = lexicon_norm(text)
+    return [(norm[s:e], p) for s, e, p in matcher.find(norm)]
+
+def concepts(text):
+    return [cid for cid, _ in lexicon().match(text)]
+
+def test_word_boundary_in_spaced_scripts():
+    m = PhraseMatcher({"zen": "zen", "sáo": "flute"})
+    assert spans(m, "Zen garden") == [("zen", "zen")]
+    assert spans(m, "zenith citizens") == []
+    assert spans(m, "Sáo-trúc") == [("sáo", "flute")]  # tanda baca = batas kata
+
+def test_leftmost_then_longest():
+    m = PhraseMatcher({"deep": 1, "deep sleep": 2, "sleep music": 3})
+    assert spans(m, "deep sleep music") == [("deep sleep", 2)]
+    assert spans(m, "very deep relaxing sleep music") == [("deep", 1), ("sleep music", 3)]
+
+def test_multiword_vietnamese():
+    assert concepts("Nhạc sáo trúc chữa lành") == ["bamboo_flute", "healing"]  # bukan "flute" dari "sáo"
+    assert concepts("Tây-Tạng thiền") == ["tibet", "meditation"]
+    assert concepts("TÂY TẠNG") == ["tibet"]
+
+@pytest.mark.parametrize("text, expected", [
+    ("チベット瞑想フルート", ["tibet", "meditation", "flute"]),
+    ("西藏冥想竹笛音乐", ["tibet", "meditation", "bamboo_flute"]),
+    ("ดนตรีขลุ่ยไม้ไผ่ทิเบต", ["bamboo_flute", "tibet"]),  # frase Thai terpanjang menang atas "ขลุ่ย"
+])
+def test_no_space_scripts(text, expected):
+    assert concepts(text) == expected
+
+def test_shared_language_term_is_not_a_language_hint():
+    # "tibet" ada di en dan id → bukan petunjuk bahasa; varian en/id identik dengan asli → dibuang
+    assert expand_keyword_variants("tibet") == [("tibet", None)]
+    assert expand_keyword_variants("tibet healing") == [("tibet healing", None), ("tibet penyembuhan", "id")]
+
+def test_unique_terms_add_their_language():
+    variants = expand_keyword_variants("sáo trúc meditation")
+    assert variants[0] == ("sáo trúc meditation", None)
+    assert set(variants[1:]) == {("sáo trúc thiền", "vi"), ("bamboo flute meditation", "en"), ("suling bambu meditasi", "id")}
+    # semua istilah vi → varian vi sama dengan asli, tetap ada en + id
+    assert [l for _, l in expand_keyword_variants("sáo trúc tây tạng")] == [None, "en", "id"]
+
+def test_empty_and_unknown_keywords():
+    assert expand_keyword_variants("   ") == []
+    assert expand_keyword_variants("xyzzy") == [("xyzzy", None)]
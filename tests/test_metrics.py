@@ -0,0 +1,55 @@
+"""Ekspor metrik: teks Prometheus 0.0.4, baris JSONL, dan log observasi."""
+import json
+
+from yt_core import METRICS_BUCKETS, Metrics
+
+def sample(m):
+    m.inc("yt_api_requests_total", endpoint="search", outcome="ok")
+    m.inc("yt_api_requests_total", 2, endpoint="videos", outcome="ok")
+    m.observe("yt_stage_seconds", 0.02, stage="sort")
+    m.observe("yt_stage_seconds", 3.0, stage="sort")
+    return m
+
+def test_prometheus_counters_histograms_and_gauges():
+    text = sample(Metrics()).to_prometheus(gauges=[("yt_quota_units_used", {"key": "ab12"}, 301)])
+    lines = text.splitlines()
+    assert text.endswith("\n")
+    assert lines.count("# TYPE yt_api_requests_total counter") == 1
+    assert 'yt_api_requests_total{endpoint="search",outcome="ok"} 1' in lines
+    assert 'yt_api_requests_total{endpoint="videos",outcome="ok"} 2' in lines
+    assert "# TYPE yt_stage_seconds histogram" in lines
+    buckets = [l for l in lines if l.startswith("yt_stage_seconds_bucket")]
+    assert len(buckets) == len(METRICS_BUCKETS) + 1
+    assert 'yt_stage_seconds_bucket{stage="sort",le="0.01"} 0' in lines
+    assert 'yt_stage_seconds_bucket{stage="sort",le="0.025"} 1' in lines  # kumulatif
+    assert 'yt_stage_seconds_bucket{stage="sort",le="5.0"} 2' in lines
+    assert 'yt_stage_seconds_bucket{stage="sort",le="+Inf"} 2' in lines
+    assert 'yt_stage_seconds_sum{stage="sort"} 3.020000' in lines
+    assert 'yt_stage_seconds_count{stage="sort"} 2' in lines
+    assert lines[-2:] == ["# TYPE yt_quota_units_used gauge", 'yt_quota_units_used{key="ab12"} 301']
+
+def test_prometheus_label_escaping_and_unlabelled():
+    m = Metrics()
+    m.inc("yt_errors_total", model='a"b\\c\nd')
+    m.inc("yt_reruns_total")
+    lines = m.to_prometheus().splitlines()
+    assert 'yt_errors_total{model="a\\"b\\\\c\\nd"} 1' in lines
+    assert "yt_reruns_total 1" in lines
+
+def test_jsonl_rows():
+    rows = [json.loads(l) for l in sample(Metrics()).to_jsonl().splitlines()]
+    assert [r["kind"] for r in rows] == ["counter", "counter", "timer"]
+    assert len({r["ts"] for r in rows}) == 1
+    assert rows[1] == dict(rows[1], metric="yt_api_requests_total", labels={"endpoint": "videos", "outcome": "ok"}, value=2)
+    timer = rows[2]
+    assert timer["labels"] == {"stage": "sort"} and timer["count"] == 2
+    assert (timer["sum_ms"], timer["avg_ms"], timer["max_ms"]) == (3020.0, 1510.0, 3000.0)
+
+def test_observations_are_logged(tmp_path):
+    log = tmp_path / "metrics.jsonl"
+    m = Metrics(str(log))
+    with m.timer("yt_stage_seconds", stage="render") as t:
+        pass
+    ev = json.loads(log.read_text(encoding="utf-8"))
+    assert ev["metric"] == "yt_stage_seconds" and ev["labels"] == {"stage": "render"} and ev["ms"] == round(t.ms, 2)
+    assert m.snapshot()["recent"] == [ev]
@@ -0,0 +1,26 @@
+"""Ringkasan niche: preview hasil parsial tidak mengubah record bersama, metrik, atau cache index."""
+import itertools
+
+from yt_core import build_video_record, metrics, render_niche_summary, term_indexes
+
+_ids = itertools.count()
+
+def rec(title, channel="c1", seconds=180, views=1000):
+    snip = {"title": title, "channelTitle": channel, "channelId": channel, "publishedAt": "2024-01-01T03:00:00Z"}
+    return build_video_record(f"n{next(_ids)}", snip, {"viewCount": str(views)}, {"duration": f"PT{seconds}S"})
+
+def test_preview_has_no_side_effects():
+    videos = [rec("Tibetan Flute Healing Music"), rec("Tibetan Flute Healing Music (HD)", "c2"), rec("Ocean Waves Night")]
+    collapsed = metrics().counter("yt_duplicates_collapsed_total")
+    cached = len(term_indexes()._lru)
+    md = render_niche_summary(videos, "flute tibet", preview=True)
+    assert "Ringkasan Niche" in md and "flute" in md
+    assert all(v.dupes is None for v in videos)
+    assert metrics().counter("yt_duplicates_collapsed_total") == collapsed
+    assert len(term_indexes()._lru) == cached
+
+def test_full_summary_collapses_once():
+    videos = [rec("Zen Garden Rain Sounds"), rec("Zen Garden Rain Sounds (HD)", "c2", views=5000)]
+    collapsed = metrics().counter("yt_duplicates_collapsed_total")
+    assert "total 1" in render_niche_summary(videos, "zen rain")
+    assert metrics().counter("yt_duplicates_collapsed_total") == collapsed + 1
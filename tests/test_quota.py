@@ -0,0 +1,63 @@
+"""QuotaLedger + plan_search_budget: pemotongan varian saat sisa kuota tipis."""
+import uuid
+
+import pytest
+
+import yt_core
+from yt_core import QUOTA_COST, QUOTA_RESERVE, SEARCH_URL, QuotaLedger, plan_search_budget, quota_remaining, search_jobs
+
+KEYWORD = "sáo trúc meditation"  # 4 varian (asli, vi, en, id), tidak ada yang ter-cache
+
+def fresh_key():
+    return f"test-{uuid.uuid4().hex}"
+
+@pytest.fixture
+def day(monkeypatch):
+    today = ["2026-03-01"]
+    monkeypatch.setattr(yt_core, "pacific_day", lambda: today[0])
+    return today
+
+def test_ledger_resets_on_new_pacific_day(tmp_path, day):
+    ledger, key = QuotaLedger(str(tmp_path / "q.sqlite3")), fresh_key()
+    ledger.record(key, "search", 100); ledger.record(key, "search", 100); ledger.record(key, "videos", 1)
+    assert ledger.spent(key) == 201
+    assert ledger.breakdown(key) == {"search": {"units": 200, "calls": 2}, "videos": {"units": 1, "calls": 1}}
+    assert ledger.spent(fresh_key()) == 0  # per key
+    day[0] = "2026-03-02"
+    assert ledger.spent(key) == 0 and ledger.breakdown(key) == {}
+
+def test_exhausted_only_for_the_day_it_was_reported(day):
+    key = fresh_key()
+    yt_core.quota_ledger().mark_exhausted(key)
+    assert yt_core.quota_ledger().exhausted(key) and quota_remaining(key, 10_000) == 0
+    day[0] = "2026-03-02"
+    assert not yt_core.quota_ledger().exhausted(key) and quota_remaining(key, 10_000) == 10_000
+
+def test_plenty_of_quota_is_not_trimmed():
+    plan = plan_search_budget(fresh_key(), KEYWORD, "date", 15, "Semua", limit=10_000)
+    assert not plan["degraded"] and not plan["cache_only"] and plan["estimate"]["uncached"] == 4
+
+def test_single_page_search_keeps_affordable_variants():
+    remaining = 250  # 2 halaman search.list + detail
+    plan = plan_search_budget(fresh_key(), KEYWORD, "date", 15, "Semua", limit=QUOTA_RESERVE + remaining)
+    assert plan["degraded"] and not plan["cache_only"] and plan["max_variants"] == 2
+    assert plan["estimate"]["units"] <= remaining
+
+def test_tiny_quota_falls_back_to_cache_only():
+    plan = plan_search_budget(fresh_key(), KEYWORD, "date", 15, "Semua", limit=QUOTA_RESERVE + 50)
+    assert plan["degraded"] and plan["cache_only"]
+
+def test_deep_search_is_trimmed_to_what_all_pages_cost():
+    assert len(search_jobs(KEYWORD)) == 4
+    remaining = 450  # 4 halaman search.list + detail
+    plan = plan_search_budget(fresh_key(), KEYWORD, "date", 15, "Semua", max_pages=3, cap=120, limit=QUOTA_RESERVE + remaining)
+    assert plan["degraded"] and not plan["cache_only"]
+    assert plan["max_variants"] == 1  # 1 varian × 3 halaman; 2 varian sudah 6 halaman
+    assert plan["estimate"]["pages"] == 3
+    assert plan["estimate"]["units"] <= remaining
+
+def test_deep_search_falls_back_to_first_pages_when_no_variant_fits_fully():
+    remaining = 250  # 2 halaman: tidak cukup untuk 3 halaman satu varian
+    plan = plan_search_budget(fresh_key(), KEYWORD, "date", 15, "Semua", max_pages=3, cap=120, limit=QUOTA_RESERVE + remaining)
+    assert not plan["cache_only"] and plan["max_variants"] == 2
+    assert plan["page_budget"] == remaining // QUOTA_COST[SEARCH_URL]  # halaman lanjutan dibatasi saat crawl
@@ -0,0 +1,29 @@
+"""VideoRecord: batas token deskripsi, potongan deskripsi, dan string yang di-intern."""
+import sys
+
+from yt_core import DESC_PREVIEW, DESC_TOKENS, build_video_record
+
+def rec(title, desc, vid="r1", channel="Kanal Musik"):
+    snip = {"title": title, "channelTitle": channel, "channelId": "UC" + channel.replace(" ", ""),
+            "description": desc, "publishedAt": "2024-01-01T00:00:00Z"}
+    return build_video_record(vid, snip, {"viewCount": "5"}, {"duration": "PT3M"})
+
+def test_description_tokens_are_capped_after_title_tokens():
+    desc = " ".join(f"kata{i:03d}" for i in range(DESC_TOKENS * 3))
+    v = rec("Tibetan Flute Healing", desc)
+    assert v.n_title == 3 and v.tokens[:v.n_title] == ("tibetan", "flute", "healing")
+    assert v.tokens[v.n_title:] == tuple(f"kata{i:03d}" for i in range(DESC_TOKENS))
+
+def test_short_description_keeps_all_tokens():
+    v = rec("Ocean Waves", "calm ocean tide")
+    assert v.tokens == ("ocean", "waves", "calm", "ocean", "tide")
+
+def test_description_is_truncated_to_preview():
+    v = rec("x", "a" * (DESC_PREVIEW * 2))
+    assert v.description == "a" * DESC_PREVIEW
+
+def test_shared_strings_are_interned():
+    a, b = rec("Rain Sounds Sleep", "rain thunder", "r1"), rec("".join(["Rain Sounds ", "Sleep"]), "rain", "r2")
+    assert a.title is b.title and a.channel is b.channel and a.channelId is b.channelId
+    assert all(sys.intern(t) is t for t in a.tokens + b.tokens)
+    assert a.tokens[0] is b.tokens[0]
@@ -0,0 +1,37 @@
+"""SnapshotStore.velocity: laju views berjendela 6/24 jam dari snapshot."""
+import pytest
+
+from yt_core import SnapshotStore
+
+HOUR = 3600
+NOW = 1_700_000_000.0
+
+def item(vid, views):
+    return {"id": vid, "statistics": {"viewCount": str(views)}}
+
+@pytest.fixture
+def store(tmp_path):
+    return SnapshotStore(str(tmp_path / "snap.sqlite3"))
+
+def test_windowed_rates(store):
+    store.record([item("a", 1000)], now=NOW - 25 * HOUR)
+    store.record([item("a", 4000)], now=NOW - 7 * HOUR)
+    vel = store.velocity({"a": (NOW, 5200)})["a"]
+    assert vel["vel6"] == pytest.approx(1200 / 7, abs=0.5)
+    assert vel["vel24"] == pytest.approx(4200 / 25, abs=0.5)
+
+def test_short_history_uses_oldest_snapshot(store):
+    store.record([item("a", 1000)], now=NOW - 2 * HOUR)
+    vel = store.velocity({"a": (NOW, 1600)})["a"]
+    assert vel["vel6"] == pytest.approx(300, abs=1) and vel["vel24"] == pytest.approx(300, abs=1)
+
+def test_too_recent_history_is_none(store):
+    store.record([item("a", 1000)], now=NOW - 10 * 60)
+    assert store.velocity({"a": (NOW, 1100)})["a"] == {"vel6": None, "vel24": None}
+
+def test_stale_baseline_is_not_a_window_rate(store):
+    store.record([item("a", 1000)], now=NOW - 5 * 24 * HOUR)  # hanya snapshot 5 hari lalu
+    assert store.velocity({"a": (NOW, 13000)})["a"] == {"vel6": None, "vel24": None}
+    store.record([item("a", 10000)], now=NOW - 30 * HOUR)  # dalam 2× jendela 24 jam
+    vel = store.velocity({"a": (NOW, 13000)})["a"]
+    assert vel["vel6"] is None and vel["vel24"] == pytest.approx(100, abs=1)
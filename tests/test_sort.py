@@ -0,0 +1,46 @@
+"""Sort/filter NumPy harus identik dengan sorted(..., reverse=True) dan list comprehension versi lama."""
+import itertools
+import random
+
+import pytest
+
+from yt_core import SORT_KEYS, apply_client_sort, build_video_record, filter_by_video_type, video_columns
+
+_ids = itertools.count()
+
+def rec(title, views, day, seconds=180, live="none"):
+    snip = {"title": title, "channelTitle": "c", "channelId": "c", "publishedAt": f"2024-01-{day:02d}T00:00:00Z",
+            "liveBroadcastContent": live}
+    return build_video_record(f"s{next(_ids)}", snip, {"viewCount": str(views)}, {"duration": f"PT{seconds}S"})
+
+@pytest.fixture
+def items():
+    rnd = random.Random(7)
+    titles = ["flute tibet healing", "tibet meditation", "ocean waves", "flute", "rain sounds sleep"]
+    # banyak nilai kembar (views/tanggal/judul sama) supaya stabilitas urutan ikut teruji
+    out = [rec(rnd.choice(titles), rnd.choice([0, 10, 500, 500, 9000]), rnd.choice([1, 2, 2, 5]),
+               rnd.choice([30, 60, 61, 600]), rnd.choice(["none", "none", "live", "upcoming"])) for _ in range(60)]
+    for v in out[::3]:
+        v.vel24 = rnd.choice([1.5, 20.0, 20.0])
+    return out
+
+@pytest.mark.parametrize("option", list(SORT_KEYS))
+def test_sort_matches_sorted_reverse(items, option):
+    cols = video_columns(items, "flute tibet")
+    pos = {id(v): i for i, v in enumerate(items)}
+    expected = sorted(items, key=lambda v: tuple(float(cols[k][pos[id(v)]]) for k in SORT_KEYS[option]), reverse=True)
+    assert [v.id for v in apply_client_sort(items, option, "flute tibet")] == [v.id for v in expected]
+
+def test_unknown_option_and_empty_input_are_untouched(items):
+    assert apply_client_sort(items, "Tanpa Urutan") is items
+    assert apply_client_sort([], "Terbaru") == []
+
+@pytest.mark.parametrize("label", ["Short", "Regular", "Live"])
+def test_filter_matches_comprehension(items, label):
+    assert filter_by_video_type(items, label) == [v for v in items if v.ctype == label]
+
+def test_filter_types():
+    short, regular, live, upcoming = rec("a", 1, 1, 60), rec("b", 1, 1, 61), rec("c", 1, 1, 30, "live"), rec("d", 1, 1, 30, "upcoming")
+    assert [v.ctype for v in (short, regular, live, upcoming)] == ["Short", "Regular", "Live", "Other"]
+    assert filter_by_video_type([short, upcoming], "Short") == [short]
+    assert filter_by_video_type([short, upcoming], "Semua") == [short, upcoming]
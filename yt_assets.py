@@ -0,0 +1,81 @@
+"""CSS dan template HTML statis untuk UI. Dirakit sekali per proses (modul di-cache di sys.modules),
+bukan di tiap rerun Streamlit; per kartu hanya tinggal .format() bagian yang dinamis."""
+import functools
+import os
+
+APP_CSS = """
+<style>
+.yt-title a, .yt-title button { color:#e6e6e6; font-weight:700; font-size:16px; line-height:1.3; text-decoration:none; display:block; margin-top:8px; background:none; border:none; padding:0; text-align:left; cursor:pointer; }
+.yt-title a:hover, .yt-title button:hover { color:#ffffff; text-decoration:underline; }
+.yt-channel { color:#9aa0a6; font-size:13px; margin:6px 0 2px 0; }
+.yt-meta { color:#9aa0a6; font-size:12px; margin-top:2px; }
+.yt-dot { display:inline-block; width:4px; height:4px; background:#9aa0a6; border-radius:50%; margin:0 6px; vertical-align:middle; }
+.chip { display:inline-block; padding:4px 10px; border-radius:999px; font-size:12px; margin-right:6px; margin-top:6px; color:white; }
+.chip-vph { background:#4b8bff; } /* VPH biru */
+.chip-vel { background:#f4511e; } /* velocity 24 jam oranye */
+</style>
+"""
+
+PILL_LIVE = '<span class="pill live">LIVE</span>'
+PILL_SHORT = '<span class="pill short">SHORT</span>'
+
+# ---------------- Kartu tunggal (mode klasik) ----------------
+CARD_HEAD = """
+<!DOCTYPE html><html><head><meta charset="utf-8">
+<style>
+  body { margin:0; background:transparent; }
+  .card { position:relative; display:block; width:100%; border-radius:12px; overflow:hidden; background:#111418; }
+  .thumb { width:100%; aspect-ratio:16/9; object-fit:cover; display:block; }
+  .dur { position:absolute; right:8px; bottom:8px; background:rgba(0,0,0,.85); color:#fff; font-size:12px; padding:2px 6px; border-radius:6px; }
+  .pill { position:absolute; left:8px; top:8px; font-weight:700; font-size:12px; padding:2px 8px; border-radius:999px; color:#fff; }
+  .pill.live { background:#e53935; }   /* LIVE merah */
+  .pill.short { background:#1e88e5; }  /* SHORT biru */
+  a { text-decoration:none; }
+</style></head>
+"""
+
+CARD_BODY = """<body>
+  <a href="?open={vid}" target="_top" class="card" title="Preview">
+    {pill}
+    <img class="thumb" src="{thumb}">
+    <span class="dur">{duration}</span>
+  </a>
+</body></html>
+"""
+
+# ---------------- Grid (satu komponen per halaman) ----------------
+GRID_CARD = """
+  <a href="#" data-vid="{vid}" class="card" title="Preview">
+    <div class="thumbwrap">{pill}<img class="thumb" loading="lazy" decoding="async" src="{thumb}"><span class="dur">{duration}</span></div>
+    <div class="title">{title}</div>
+    <div class="channel">{channel}</div>
+    <div class="meta">{views} x ditonton <span class="dot"></span> {rel}</div>
+    <div class="meta"><span class="chip">⚡ {vph} VPH</span>{vel}{dup} 🕒 {jam}</div>
+  </a>"""
+
+GRID_STYLE = """
+  body { margin:0; background:transparent; font-family:"Source Sans Pro",sans-serif; }
+  .grid { display:grid; grid-template-columns:repeat(__COLUMNS__, 1fr); gap:16px; }
+  .card { display:block; text-decoration:none; color:#e6e6e6; }
+  .thumbwrap { position:relative; border-radius:12px; overflow:hidden; background:#111418; }
+  .thumb { width:100%; aspect-ratio:16/9; object-fit:cover; display:block; }
+  .dur { position:absolute; right:8px; bottom:8px; background:rgba(0,0,0,.85); color:#fff; font-size:12px; padding:2px 6px; border-radius:6px; }
+  .pill { position:absolute; left:8px; top:8px; font-weight:700; font-size:12px; padding:2px 8px; border-radius:999px; color:#fff; }
+  .pill.live { background:#e53935; }
+  .pill.short { background:#1e88e5; }
+  .title { font-weight:700; font-size:15px; line-height:1.3; margin-top:8px; display:-webkit-box; -webkit-line-clamp:2; -webkit-box-orient:vertical; overflow:hidden; }
+  .card:hover .title { color:#fff; text-decoration:underline; }
+  .channel { color:#9aa0a6; font-size:13px; margin:6px 0 2px 0; }
+  .meta { color:#9aa0a6; font-size:12px; margin-top:2px; }
+  .dot { display:inline-block; width:4px; height:4px; background:#9aa0a6; border-radius:50%; margin:0 6px; vertical-align:middle; }
+  .chip { display:inline-block; padding:3px 9px; border-radius:999px; font-size:12px; margin:4px 6px 0 0; color:#fff; background:#4b8bff; }
+  .chip.vel { background:#f4511e; }
+  .chip.dup { background:#5f6368; }
+"""
+
+GRID_COMPONENT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "yt_grid")  # index.html komponen grid
+
+@functools.lru_cache(maxsize=8)
+def grid_style(columns: int) -> str:
+    """CSS grid; satu varian per jumlah kolom."""
+    return GRID_STYLE.replace("__COLUMNS__", str(int(columns)))
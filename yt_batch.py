@@ -0,0 +1,114 @@
+"""Riset keyword YouTube tanpa Streamlit (untuk cron / worker).
+
+Contoh:
+    YT_API_KEY=... python yt_batch.py keywords.txt --out hasil/ --workers 8
+    python yt_batch.py keywords.txt --format parquet --depth 3 --cap 500
+
+File keyword: satu keyword per baris, baris kosong / diawali '#' dilewati, '-' = stdin.
+Per keyword ditulis <nn>-<slug>.csv|parquet dan <nn>-<slug>.md (ringkasan niche, judul, tag),
+lalu _summary.json berisi metrik semua keyword.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from yt_core import (
+    UNION_CAP, QUOTA_DAILY_DEFAULT, SORT_KEYS,
+    research_keyword, render_niche_summary, generate_titles_from_data, global_tag_string,
+    videos_dataframe, views_stats, quota_ledger,
+)
+
+def read_keywords(path):
+    fh = sys.stdin if path == "-" else open(path, encoding="utf-8")
+    with fh:
+        lines = [ln.strip() for ln in fh]
+    return list(dict.fromkeys(ln for ln in lines if ln and not ln.startswith("#")))
+
+def slugify(keyword: str) -> str:
+    return re.sub(r"[^\w]+", "-", keyword.lower()).strip("-")[:80] or "keyword"
+
+def write_outputs(res, out_dir, stem, fmt, sort_option):
+    videos, keyword = res["videos"], res["keyword"]
+    df = videos_dataframe(videos)
+    df.insert(0, "ID", [v.id for v in videos])
+    if fmt == "parquet":
+        data_path = os.path.join(out_dir, f"{stem}.parquet")
+        df.to_parquet(data_path, index=False)
+    else:
+        data_path = os.path.join(out_dir, f"{stem}.csv")
+        df.to_csv(data_path, index=False)
+    md = [f"# {keyword}", ""]
+    if videos:
+        md += [render_niche_summary(videos, keyword), "", "### 💡 Rekomendasi Judul"]
+        md += [f"{i}. {t}" for i, t in enumerate(generate_titles_from_data(videos, sort_option), 1)]
+        md += ["", "### 🏷️ Rekomendasi Tag", global_tag_string(videos)]
+    else:
+        md.append("Tidak ada video.")
+    if res["errors"]:
+        md += ["", "### ⚠️ Permintaan gagal"] + [f"- {e}" for e in res["errors"]]
+    with open(os.path.join(out_dir, f"{stem}.md"), "w", encoding="utf-8") as fh:
+        fh.write("\n".join(md) + "\n")
+    return data_path
+
+def run_one(args, idx, keyword):
+    t0 = time.perf_counter()
+    res = research_keyword(args.api_key, keyword, sort_option=args.sort, video_type_label=args.type,
+                           max_per_query=args.per_variant, max_pages=args.depth, cap=args.cap, limit=args.quota_limit)
+    stem = f"{idx:03d}-{slugify(keyword)}"
+    path = write_outputs(res, args.out, stem, args.format, args.sort)
+    stat = views_stats(res["videos"]) if res["videos"] else {"avg": 0, "med": 0, "vph": 0.0, "n": 0}
+    plan = res["plan"] or {}
+    return {"keyword": keyword, "file": os.path.basename(path), "videos": stat["n"], "avg_views": stat["avg"],
+            "median_views": stat["med"], "avg_vph": stat["vph"], "errors": res["errors"],
+            "degraded": plan.get("degraded", False), "cache_only": plan.get("cache_only", False),
+            "seconds": round(time.perf_counter() - t0, 3)}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Riset keyword YouTube lintas bahasa secara batch (tanpa UI).")
+    ap.add_argument("keywords", help="file daftar keyword (satu per baris) atau '-' untuk stdin")
+    ap.add_argument("--out", default="hasil_riset", help="folder output (default: hasil_riset)")
+    ap.add_argument("--api-key", default=os.environ.get("YT_API_KEY", ""), help="YouTube Data API key (default: env YT_API_KEY)")
+    ap.add_argument("--sort", default="VPH Tertinggi", choices=list(SORT_KEYS))
+    ap.add_argument("--type", default="Semua", choices=["Semua", "Regular", "Short", "Live"])
+    ap.add_argument("--per-variant", type=int, default=15, help="video per varian bila --depth 1 (5–50)")
+    ap.add_argument("--depth", type=int, default=1, help="halaman search.list per varian (nextPageToken)")
+    ap.add_argument("--cap", type=int, default=UNION_CAP, help="batas total video per keyword")
+    ap.add_argument("--workers", type=int, default=4, help="keyword yang diproses paralel")
+    ap.add_argument("--format", default="csv", choices=["csv", "parquet"], help="format data per keyword (parquet butuh pyarrow)")
+    ap.add_argument("--quota-limit", type=int, default=QUOTA_DAILY_DEFAULT, help="batas kuota harian (unit) untuk perencanaan")
+    args = ap.parse_args(argv)
+    if not args.api_key:
+        ap.error("API key kosong: pakai --api-key atau env YT_API_KEY")
+
+    keywords = read_keywords(args.keywords)
+    if not keywords:
+        ap.error("daftar keyword kosong")
+    os.makedirs(args.out, exist_ok=True)
+    t0 = time.perf_counter()
+    rows, failed = [], 0
+    with ThreadPoolExecutor(max_workers=max(1, args.workers)) as ex:
+        futs = {ex.submit(run_one, args, i, kw): kw for i, kw in enumerate(keywords, 1)}
+        for fut in as_completed(futs):
+            kw = futs[fut]
+            try:
+                row = fut.result()
+                print(f"✅ {kw}: {row['videos']} video ({row['seconds']}s)" + (f", {len(row['errors'])} gagal" if row["errors"] else ""), file=sys.stderr)
+            except Exception as e:
+                failed += 1
+                row = {"keyword": kw, "error": str(e)}
+                print(f"❌ {kw}: {e}", file=sys.stderr)
+            rows.append(row)
+    rows.sort(key=lambda r: keywords.index(r["keyword"]))
+    summary = {"keywords": len(keywords), "failed": failed, "seconds": round(time.perf_counter() - t0, 3),
+               "quota_spent_today": quota_ledger().spent(args.api_key), "results": rows}
+    with open(os.path.join(args.out, "_summary.json"), "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, ensure_ascii=False, indent=2)
+    print(f"Selesai: {len(keywords) - failed}/{len(keywords)} keyword dalam {summary['seconds']}s → {args.out}", file=sys.stderr)
+    return 1 if failed == len(keywords) else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
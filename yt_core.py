@@ -0,0 +1,2296 @@
+"""Inti riset YouTube tanpa Streamlit: fetch (search/videos + cache, kuota, store), record video,
+sort/filter, analitik niche, dan asisten konten Gemini. Dipakai oleh app Streamlit dan CLI batch."""
+import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timezone, timedelta
+import contextlib
+import functools
+import math
+import re
+import os
+import json
+import time
+import hashlib
+import sqlite3
+import threading
+import random
+import queue
+import sys
+import unicodedata
+import uuid
+import weakref
+import zlib
+from statistics import mean, median
+try:
+    from zoneinfo import ZoneInfo
+except Exception:
+    ZoneInfo = None
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+STOPWORDS = set("""
+a an and the for of to in on with from by at as or & | - live official lyrics lyric audio video music mix hour hours relax relaxing study sleep deep best new latest 4k 8k
+""".split())
+
+# YT_API_BASE / GEMINI_API_BASE: arahkan ke stand-in lokal (fake_api.py) untuk benchmark tanpa kuota
+YT_API_BASE = os.environ.get("YT_API_BASE", "https://www.googleapis.com/youtube/v3").rstrip("/")
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "").rstrip("/")
+SEARCH_URL = f"{YT_API_BASE}/search"
+VIDEOS_URL = f"{YT_API_BASE}/videos"
+HTTP_TIMEOUT = (5, 15)  # (connect, read) detik per panggilan
+SEARCH_WORKERS = 8      # batas thread paralel untuk fan-out varian
+CACHE_DB = os.environ.get("YT_CACHE_DB", os.path.join(os.path.dirname(os.path.abspath(__file__)), ".yt_cache.sqlite3"))
+CACHE_TTL_SEARCH = 60 * 60    # hasil search.list jarang berubah dalam 1 jam
+CACHE_TTL_STATS = 15 * 60     # statistik video (views) cepat berubah
+CACHE_MAX_ENTRIES = 5000
+VIDEO_META_TTL = 7 * 24 * 3600  # snippet + contentDetails hampir tidak pernah berubah
+VIDEO_STATS_TTL = CACHE_TTL_STATS
+DETAIL_BATCH = 50               # batas id per videos.list
+DETAIL_WORKERS = 4
+DETAIL_WAIT = 30                # detik maksimum menunggu videos.list milik sesi lain (single-flight)
+# Partial response (`fields=`): hanya properti yang dibaca VideoRecord / iter_search_pages
+VIDEO_PARTS_FULL = "statistics,snippet,contentDetails"
+VIDEO_FIELDS_FULL = ("etag,items(id,snippet(publishedAt,channelId,title,description,thumbnails/high/url,channelTitle,"
+                     "liveBroadcastContent),statistics/viewCount,contentDetails/duration)")
+VIDEO_FIELDS_STATS = "etag,items(id,statistics/viewCount)"
+SEARCH_FIELDS = "etag,nextPageToken,items/id/videoId"
+HTTP_USER_AGENT = "yt-research/1.0 (gzip)"  # Google API hanya mengirim gzip bila User-Agent memuat "gzip"
+# Biaya unit kuota YouTube Data API v3 per panggilan (reset harian 00:00 Pacific)
+QUOTA_COST = {SEARCH_URL: 100, VIDEOS_URL: 1}
+QUOTA_DAILY_DEFAULT = int(os.environ.get("YT_QUOTA_DAILY", 10000))
+QUOTA_RESERVE = 200     # sisa minimum yang tidak dipakai otomatis (trending/detail)
+UNION_CAP = int(os.environ.get("YT_UNION_CAP", 120))  # batas ID unik hasil gabungan varian
+SEARCH_PAGE_SIZE = 50  # maxResults maksimum search.list per halaman
+# Snapshot views (velocity berjendela): satu baris per (video, menit) tiap statistik segar masuk
+VELOCITY_WINDOWS = {"vel6": 6 * 3600, "vel24": 24 * 3600}
+SNAPSHOT_MIN_SPAN = 30 * 60   # selisih minimum antar snapshot agar delta views bermakna
+SNAPSHOT_MAX_AGE = 2          # baseline paling tua = 2× jendela; lebih tua → bukan lagi laju 6/24 jam
+SNAPSHOT_RETENTION = int(os.environ.get("YT_SNAPSHOT_DAYS", 30)) * 24 * 3600
+# Memori sesi: record menyimpan cuplikan deskripsi saja; hasil AI di LRU proses dengan batas global + per sesi
+DESC_PREVIEW = 300            # karakter deskripsi per record (versi utuh dibaca dari VideoStore saat dibutuhkan)
+DESC_TOKENS = 80              # token deskripsi pertama yang disimpan di record (relevansi/TF-IDF)
+AI_MEM_GLOBAL = int(os.environ.get("YT_AI_MEM_MB", 64)) * 2**20
+AI_MEM_SESSION = int(os.environ.get("YT_AI_MEM_SESSION_MB", 4)) * 2**20
+SEARCH_REGIONS = ["US","ID","IN","JP","KR","DE","FR","ES","BR","RU","TR","SA","EG","VN","MX"]
+
+
+# ---------------- Singleton per proses ----------------
+_singletons = {}
+_singletons_lock = threading.Lock()
+
+def process_singleton(fn):
+    """Objek dibuat sekali per proses (pengganti st.cache_resource; modul ini di-import sekali, rerun tidak membangun ulang)."""
+    @functools.wraps(fn)
+    def get():
+        if fn.__name__ not in _singletons:
+            with _singletons_lock:
+                if fn.__name__ not in _singletons: _singletons[fn.__name__] = fn()
+        return _singletons[fn.__name__]
+    return get
+
+# ---------------- Metrik / instrumentasi ----------------
+METRICS_PORT = int(os.environ.get("YT_METRICS_PORT", "0") or 0)  # >0 → endpoint Prometheus /metrics di port ini
+METRICS_LOG = os.environ.get("YT_METRICS_LOG", "")              # file JSONL: satu baris per observasi timer
+METRICS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+METRICS_RECENT = 300
+
+class _Timing:
+    __slots__ = ("seconds",)
+    def __init__(self): self.seconds = 0.0
+    @property
+    def ms(self): return self.seconds * 1000
+
+class Metrics:
+    """Counter + histogram waktu per proses (gabungan semua user/sesi), thread-safe.
+    Label dibatasi ke nilai berkardinalitas rendah (endpoint, model, tahap), bukan keyword/ID."""
+    def __init__(self, log_path=""):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._hist = {}   # (nama, label) → [count, sum, max, bucket...]
+        self._recent = []  # observasi terakhir untuk panel diagnostik
+        self._log = open(log_path, "a", encoding="utf-8") if log_path else None
+        self.started = time.time()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def inc(self, name, n=1, **labels):
+        k = self._key(name, labels)
+        with self._lock:
+            self._counters[k] = self._counters.get(k, 0) + n
+
+    def observe(self, name, seconds, **labels):
+        k = self._key(name, labels)
+        ev = {"ts": round(time.time(), 3), "metric": name, "labels": dict(k[1]), "ms": round(seconds * 1000, 2)}
+        with self._lock:
+            h = self._hist.get(k)
+            if h is None: h = self._hist[k] = [0, 0.0, 0.0] + [0] * len(METRICS_BUCKETS)
+            h[0] += 1; h[1] += seconds; h[2] = max(h[2], seconds)
+            for i, b in enumerate(METRICS_BUCKETS):
+                if seconds <= b: h[3 + i] += 1
+            self._recent.append(ev)
+            if len(self._recent) > METRICS_RECENT: del self._recent[:len(self._recent) - METRICS_RECENT]
+            if self._log:
+                self._log.write(json.dumps(ev) + "\n"); self._log.flush()
+
+    @contextlib.contextmanager
+    def timer(self, name, **labels):
+        """`with metrics().timer("nama", tahap=...) as t:` → t.ms tersedia setelah blok selesai."""
+        t, t0 = _Timing(), time.perf_counter()
+        try:
+            yield t
+        finally:
+            t.seconds = time.perf_counter() - t0
+            self.observe(name, t.seconds, **labels)
+
+    def counter(self, name, **labels):
+        with self._lock:
+            return self._counters.get(self._key(name, labels), 0)
+
+    def snapshot(self) -> dict:
+        """{"counters": [...], "timers": [...], "recent": [...]} untuk panel & ekspor JSONL."""
+        with self._lock:
+            counters = [{"metric": n, "labels": dict(l), "value": v} for (n, l), v in sorted(self._counters.items())]
+            timers = [{"metric": n, "labels": dict(l), "count": h[0], "sum_ms": round(h[1] * 1000, 2),
+                       "avg_ms": round(h[1] * 1000 / h[0], 2) if h[0] else 0.0, "max_ms": round(h[2] * 1000, 2)}
+                      for (n, l), h in sorted(self._hist.items())]
+            recent = list(self._recent)
+        return {"uptime_s": round(time.time() - self.started, 1), "counters": counters, "timers": timers, "recent": recent}
+
+    def to_jsonl(self) -> str:
+        ts = round(time.time(), 3)
+        snap = self.snapshot()
+        rows = [dict(r, ts=ts, kind="counter") for r in snap["counters"]] + [dict(r, ts=ts, kind="timer") for r in snap["timers"]]
+        return "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in rows)
+
+    def to_prometheus(self, gauges=()) -> str:
+        """Format teks Prometheus 0.0.4. `gauges` = [(nama, {label}, nilai)] tambahan (mis. kuota)."""
+        def lbl(labels, extra=()):
+            items = list(labels) + list(extra)
+            if not items: return ""
+            esc = lambda s: str(s).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in items) + "}"
+        with self._lock:
+            counters, hist = sorted(self._counters.items()), sorted(self._hist.items())
+        out, typed = [], set()
+        for (n, l), v in counters:
+            if n not in typed: out.append(f"# TYPE {n} counter"); typed.add(n)
+            out.append(f"{n}{lbl(l)} {v}")
+        for (n, l), h in hist:
+            if n not in typed: out.append(f"# TYPE {n} histogram"); typed.add(n)
+            for i, b in enumerate(METRICS_BUCKETS):
+                out.append(f"{n}_bucket{lbl(l, [('le', b)])} {h[3 + i]}")
+            out.append(f"{n}_bucket{lbl(l, [('le', '+Inf')])} {h[0]}")
+            out.append(f"{n}_sum{lbl(l)} {h[1]:.6f}")
+            out.append(f"{n}_count{lbl(l)} {h[0]}")
+        for n, labels, v in gauges:
+            if n not in typed: out.append(f"# TYPE {n} gauge"); typed.add(n)
+            out.append(f"{n}{lbl(sorted(labels.items()))} {v}")
+        return "\n".join(out) + "\n"
+
+@process_singleton
+def metrics():
+    m = Metrics(METRICS_LOG)
+    if METRICS_PORT: start_metrics_server(METRICS_PORT, m)
+    return m
+
+def start_metrics_server(port, m=None):
+    """Endpoint Prometheus /metrics (dan /metrics.jsonl) di thread daemon; dipakai bila YT_METRICS_PORT di-set."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    m = m or metrics()
+
+    class Handler(BaseHTTPRequestHandler):
+        def log_message(self, *args): pass
+        def do_GET(self):
+            if self.path.startswith("/metrics.jsonl"):
+                body, ctype = m.to_jsonl(), "application/x-ndjson"
+            elif self.path.startswith("/metrics"):
+                gauges = [("yt_quota_units_today", {"key": k}, u) for k, u in quota_ledger().totals_today().items()]
+                body, ctype = m.to_prometheus(gauges), "text/plain; version=0.0.4"
+            else:
+                self.send_error(404); return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    try:
+        srv = ThreadingHTTPServer(("0.0.0.0", port), Handler)
+    except OSError:
+        return None  # port sudah dipakai (mis. proses lain) → app tetap jalan tanpa endpoint
+    threading.Thread(target=srv.serve_forever, name="metrics-http", daemon=True).start()
+    return srv
+
+# ---------------- Single-flight (gabung request identik yang sedang berjalan) ----------------
+class _Flight:
+    __slots__ = ("done", "result", "error")
+    def __init__(self):
+        self.done, self.result, self.error = threading.Event(), None, None
+
+class SingleFlight:
+    """Request identik yang berjalan bersamaan (antar sesi/thread dalam satu proses) hanya dieksekusi sekali;
+    pemanggil lain menunggu dan memakai hasil yang sama. Bila eksekusi pertama gagal, penunggu mencoba sendiri
+    (error satu key/sesi tidak menular)."""
+    def __init__(self, name):
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def do(self, key, fn):
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader: call = self._calls[key] = _Flight()
+        if not leader:
+            call.done.wait()
+            if call.error is None:
+                metrics().inc("singleflight_total", flight=self.name, role="shared")
+                return call.result
+            return fn()
+        metrics().inc("singleflight_total", flight=self.name, role="leader")
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def claim(self, keys):
+        """Versi per-kunci untuk batch: kembalikan (kunci yang kini milik pemanggil, event kunci milik orang lain).
+        Pemilik wajib memanggil release(kunci) setelah selesai."""
+        mine, waits = [], []
+        with self._lock:
+            for k in keys:
+                call = self._calls.get(k)
+                if call is None:
+                    self._calls[k] = _Flight(); mine.append(k)
+                else:
+                    waits.append(call.done)
+        if mine: metrics().inc("singleflight_total", len(mine), flight=self.name, role="leader")
+        if waits: metrics().inc("singleflight_total", len(waits), flight=self.name, role="shared")
+        return mine, waits
+
+    def release(self, keys):
+        with self._lock:
+            calls = [self._calls.pop(k, None) for k in keys]
+        for c in calls:
+            if c is not None: c.done.set()
+
+API_FLIGHT = SingleFlight("api")        # GET search/videos identik (kunci = kunci cache, tanpa API key)
+DETAIL_FLIGHT = SingleFlight("videos")  # per video ID di yt_videos_detail
+GEMINI_FLIGHT = SingleFlight("gemini")  # prompt + model + mode identik
+
+# ---------------- Utils ----------------
+def iso8601_to_seconds(duration: str) -> int:
+    m = re.match(r"PT(?:(\d+)H)?(?:(\d+)M)?(?:(\d+)S)?", duration or "")
+    if not m: return 0
+    h, mi, s = int(m.group(1) or 0), int(m.group(2) or 0), int(m.group(3) or 0)
+    return h*3600 + mi*60 + s
+
+def fmt_duration(sec: int) -> str:
+    if sec <= 0: return "-"
+    h, m, s = sec//3600, (sec%3600)//60, sec%60
+    return f"{h}:{m:02d}:{s:02d}" if h > 0 else f"{m}:{s:02d}"
+
+def parse_published(publishedAt) -> float:
+    """publishedAt ISO-8601 → epoch detik (0.0 bila tidak valid). Angka dianggap sudah epoch."""
+    if isinstance(publishedAt, (int, float)): return float(publishedAt)
+    try:
+        return datetime.strptime(publishedAt, "%Y-%m-%dT%H:%M:%SZ").replace(tzinfo=timezone.utc).timestamp()
+    except:
+        return 0.0
+
+def hitung_vph(views, publishedAt):
+    ts = parse_published(publishedAt)
+    if not ts: return 0.0
+    hrs = (time.time() - ts) / 3600
+    return round(views/hrs, 2) if hrs > 0 else 0.0
+
+def format_views(n):
+    try: n = int(n)
+    except: return str(n)
+    if n >= 1_000_000: return f"{n/1_000_000:.1f}M"
+    if n >= 1_000: return f"{n/1_000:.1f}K"
+    return str(n)
+
+def format_rel_time(publishedAt):
+    ts = parse_published(publishedAt)
+    if not ts: return "-"
+    d = int((time.time() - ts) // 86400)
+    if d < 1: return "Hari ini"
+    if d < 30: return f"{d} hari lalu"
+    if d < 365: return f"{d//30} bulan lalu"
+    return f"{d//365} tahun lalu"
+
+def format_age(ts) -> str:
+    """Umur sebuah timestamp epoch (mis. hasil watchlist) dalam menit/jam/hari."""
+    if not ts: return "belum pernah"
+    m = int((time.time() - ts) // 60)
+    if m < 1: return "baru saja"
+    if m < 60: return f"{m} menit lalu"
+    if m < 48 * 60: return f"{m // 60} jam lalu"
+    return f"{m // 1440} hari lalu"
+
+def format_jam_utc(publishedAt):
+    ts = parse_published(publishedAt)
+    if not ts: return "-"
+    return datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M UTC")
+
+def asia_jakarta_hour(publishedAt) -> int | None:
+    ts = parse_published(publishedAt)
+    if not ts: return None
+    dt = datetime.fromtimestamp(ts, timezone.utc)
+    if ZoneInfo: return dt.astimezone(ZoneInfo("Asia/Jakarta")).hour
+    return (dt.hour + 7) % 24
+
+# ---------- Lang detect ----------
+IND_HINT = {"yang","dan","di","ke","dari","untuk","pada","kami","kamu","anda","saja","bisa","tidak","cara","apa","bagaimana","mengapa","gratis","terbaru","banget","sangat","dengan","tanpa","lebih","menjadi","agar","supaya"}
+ENG_HINT = {"the","and","for","with","to","from","you","your","how","why","what","best","guide","review","tips","tricks","new","free","without","vs","top","in","on","of"}
+def detect_lang(text: str) -> str:
+    t = text.lower()
+    toks = re.findall(r"\w+", t, flags=re.UNICODE)
+    id_score = sum(1 for w in toks if (w in IND_HINT) or w.startswith(("meng","men","mem","me","ber","ter","per","se")))
+    en_score = sum(1 for w in toks if w in ENG_HINT)
+    return "id" if id_score >= en_score else "en"
+
+# ---------------- Multilingual lexicon (niche musik/meditasi/healing) ----------------
+LEXICON_PATH = os.environ.get("YT_LEXICON", os.path.join(os.path.dirname(os.path.abspath(__file__)), "yt_lexicon.json"))
+LANG_PRIORITY = ["en","id","es","pt","fr","de","ru","ar","hi","ja","ko","zh","tr","vi","th"]
+# aksara tanpa spasi antar kata: istilahnya boleh menempel di teks sekitarnya
+_NO_SPACE_SCRIPT = re.compile(r"[\u0E00-\u0E7F\u3040-\u30FF\u3400-\u9FFF\uF900-\uFAFF]")
+
+def _is_wordchar(ch: str) -> bool:
+    return ch.isalnum() or unicodedata.category(ch)[0] == "M"  # M = tanda vokal Devanagari/Thai, diakritik
+
+def lexicon_norm(text: str) -> str:
+    """NFC + huruf kecil; tanda baca/spasi beruntun → satu spasi (jadi "Tây-Tạng" ≡ "tây tạng")."""
+    t = unicodedata.normalize("NFC", text or "").lower()
+    return " ".join("".join(ch if _is_wordchar(ch) else " " for ch in t).split())
+
+class PhraseMatcher:
+    """Automaton Aho-Corasick atas karakter: semua frase (termasuk multi-kata) ditemukan dalam satu lintasan teks.
+    Frase beraksara berspasi harus jatuh di batas kata; CJK/Thai tidak. Tumpang tindih → ambil paling kiri, lalu terpanjang."""
+    def __init__(self, phrases: dict):
+        self._goto, self._fail, self._out = [{}], [0], [[]]
+        for phrase, payload in phrases.items():
+            node = 0
+            for ch in phrase:
+                nxt = self._goto[node].get(ch)
+                if nxt is None:
+                    nxt = self._goto[node][ch] = len(self._goto)
+                    self._goto.append({}); self._fail.append(0); self._out.append([])
+                node = nxt
+            bound = not _NO_SPACE_SCRIPT.match(phrase[0]), not _NO_SPACE_SCRIPT.match(phrase[-1])
+            self._out[node].append((len(phrase), bound, payload))
+        todo = deque(self._goto[0].values())
+        while todo:  # BFS: fail link + output warisan dari sufiks terpanjang
+            node = todo.popleft()
+            for ch, nxt in self._goto[node].items():
+                f = self._fail[node]
+                while f and ch not in self._goto[f]: f = self._fail[f]
+                self._fail[nxt] = self._goto[f].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+                todo.append(nxt)
+
+    def __len__(self):
+        return len(self._goto)
+
+    def find(self, text: str):
+        """[(awal, akhir, payload)] tanpa tumpang tindih, urut posisi, pada teks yang sudah dinormalisasi."""
+        hits, node = [], 0
+        for i, ch in enumerate(text):
+            while node and ch not in self._goto[node]: node = self._fail[node]
+            node = self._goto[node].get(ch, 0)
+            for n, (left, right), payload in self._out[node]:
+                start, end = i + 1 - n, i + 1
+                if left and start > 0 and _is_wordchar(text[start - 1]): continue
+                if right and end < len(text) and _is_wordchar(text[end]): continue
+                hits.append((start, end, payload))
+        hits.sort(key=lambda h: (h[0], h[0] - h[1]))
+        out, pos = [], 0
+        for h in hits:
+            if h[0] >= pos:
+                out.append(h); pos = h[1]
+        return out
+
+class Lexicon:
+    """Konsep → istilah per bahasa (dari JSON). Istilah pertama per bahasa = istilah baku untuk frase varian."""
+    def __init__(self, data: dict):
+        self.categories = list(data.get("categories", []))
+        self.concepts = data["concepts"]
+        index = {}  # istilah ternormalisasi → {konsep: {bahasa}}
+        for cid, c in self.concepts.items():
+            for lang, terms in c["terms"].items():
+                for t in terms:
+                    index.setdefault(lexicon_norm(t), {}).setdefault(cid, set()).add(lang)
+        index.pop("", None)
+        self.n_terms = len(index)
+        self.matcher = PhraseMatcher({t: tuple((cid, frozenset(langs)) for cid, langs in by.items()) for t, by in index.items()})
+
+    @classmethod
+    def load(cls, path):
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def match(self, text: str):
+        """[(konsep, {bahasa})] untuk tiap istilah yang ditemukan di teks, urut kemunculan."""
+        return [m for _, _, payload in self.matcher.find(lexicon_norm(text)) for m in payload]
+
+    def term(self, concept: str, lang: str) -> str:
+        terms = self.concepts[concept]["terms"]
+        return (terms.get(lang) or terms["en"])[0]
+
+    def order(self, concepts):
+        """Konsep unik, diurutkan per kategori (urutan `categories`), lalu urutan kemunculan."""
+        rank = {c: i for i, c in enumerate(self.categories)}
+        uniq = list(dict.fromkeys(concepts))
+        return sorted(uniq, key=lambda c: rank.get(self.concepts[c].get("category"), len(rank)))
+
+@process_singleton
+def lexicon():
+    return Lexicon.load(LEXICON_PATH)
+
+def expand_keyword_variants(user_q: str, max_variants: int = 10):
+    """Deteksi konsep leksikon (instrumen/region/tema, termasuk frase multi-kata) dalam satu lintasan automaton,
+    lalu buat frase standar di bahasa yang terdeteksi + en/id. Istilah yang dipakai beberapa bahasa
+    (mis. "tibet") tidak dihitung sebagai petunjuk bahasa."""
+    qnorm = user_q.strip()
+    if not qnorm:
+        return []
+    lex = lexicon()
+    matches = lex.match(qnorm)
+    concepts = lex.order(cid for cid, _ in matches)
+    detected = {next(iter(langs)) for _, langs in matches if len(langs) == 1}
+    langs = [lang for lang in LANG_PRIORITY if lang in detected or lang in ("en", "id")][:max_variants]
+
+    variants = [(qnorm, None)]  # varian asli
+    if concepts:
+        variants += [(" ".join(lex.term(c, lang) for c in concepts), lang) for lang in langs]
+
+    uq, out = set(), []
+    for q, l in variants:
+        if q.lower() not in uq:
+            out.append((q, l)); uq.add(q.lower())
+    return out[:max_variants]
+
+# ---------------- API ----------------
+@process_singleton
+def http_session():
+    """Session HTTP bersama (keep-alive + connection pool + gzip) untuk semua panggilan API."""
+    s = requests.Session()
+    s.headers.update({"Accept-Encoding": "gzip", "User-Agent": HTTP_USER_AGENT})
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=SEARCH_WORKERS * 2)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    return s
+
+class ApiCache:
+    """Cache respons API di SQLite (lintas sesi & restart) dengan TTL per entri dan eviction LRU."""
+    def __init__(self, path, max_entries=CACHE_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS api_cache (k TEXT PRIMARY KEY, payload TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS api_cache_used ON api_cache(used)")
+        try:
+            self._db.execute("ALTER TABLE api_cache ADD COLUMN etag TEXT")  # DB lama dari versi sebelum ETag
+        except sqlite3.OperationalError:
+            pass
+        self._db.commit()
+
+    @staticmethod
+    def make_key(url, params):
+        """Kunci = URL + parameter ternormalisasi (tanpa API key)."""
+        norm = {}
+        for k, v in params.items():
+            if k == "key" or v is None: continue
+            v = str(v).strip()
+            if k == "q": v = " ".join(v.lower().split())
+            norm[k] = v
+        raw = url + "?" + json.dumps(norm, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def get(self, k):
+        now = time.time()
+        with self._lock:
+            row = self._db.execute("SELECT payload, expires FROM api_cache WHERE k=?", (k,)).fetchone()
+            if not row or row[1] < now:
+                self.misses += 1
+                return None
+            self._db.execute("UPDATE api_cache SET used=? WHERE k=?", (now, k))
+            self._db.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def set(self, k, payload, ttl, etag=None):
+        now = time.time()
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO api_cache (k, payload, expires, used, etag) VALUES (?,?,?,?,?)",
+                             (k, json.dumps(payload, ensure_ascii=False), now + ttl, now, etag))
+            n = self._db.execute("SELECT COUNT(*) FROM api_cache").fetchone()[0]
+            if n > self.max_entries:
+                n -= self._db.execute("DELETE FROM api_cache WHERE expires < ?", (now,)).rowcount
+                self._db.execute("DELETE FROM api_cache WHERE k IN (SELECT k FROM api_cache ORDER BY used ASC LIMIT ?)",
+                                 (max(0, n - self.max_entries),))
+            self._db.commit()
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM api_cache")
+            self._db.commit()
+            self.hits = self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            n = self._db.execute("SELECT COUNT(*) FROM api_cache").fetchone()[0]
+        total = self.hits + self.misses
+        return {"entries": n, "hits": self.hits, "misses": self.misses, "hit_ratio": round(self.hits / total, 3) if total else 0.0}
+
+    def stale(self, k):
+        """(payload, etag) entri kedaluwarsa yang masih tersimpan — untuk revalidasi If-None-Match; None bila tak ada."""
+        with self._lock:
+            row = self._db.execute("SELECT payload, etag FROM api_cache WHERE k=? AND etag IS NOT NULL", (k,)).fetchone()
+        return (json.loads(row[0]), row[1]) if row else None
+
+    def fetched_at(self, k, ttl):
+        """Waktu payload entri diambil (atau terakhir divalidasi 304) = expires − ttl; None bila tak ada."""
+        with self._lock:
+            row = self._db.execute("SELECT expires FROM api_cache WHERE k=?", (k,)).fetchone()
+        return row[0] - ttl if row else None
+
+    def has(self, k):
+        """Cek entri masih segar tanpa mengubah counter hit/miss."""
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM api_cache WHERE k=? AND expires>=?", (k, time.time())).fetchone()
+        return row is not None
+
+@process_singleton
+def api_cache():
+    return ApiCache(CACHE_DB)
+
+class QuotaExhausted(RuntimeError):
+    pass
+
+def pacific_day() -> str:
+    tz = ZoneInfo("America/Los_Angeles") if ZoneInfo else timezone(timedelta(hours=-8))
+    return datetime.now(tz).strftime("%Y-%m-%d")
+
+class QuotaLedger:
+    """Catat unit kuota terpakai per API key (di-hash) per hari Pacific, per endpoint."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS quota_spend (key_hash TEXT, day TEXT, endpoint TEXT, units INTEGER NOT NULL, calls INTEGER NOT NULL, PRIMARY KEY (key_hash, day, endpoint))")
+        self._db.commit()
+
+    @staticmethod
+    def key_hash(api_key):
+        return hashlib.sha1((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+    def record(self, api_key, endpoint, units):
+        with self._lock:
+            self._db.execute(
+                "INSERT INTO quota_spend VALUES (?,?,?,?,1) ON CONFLICT(key_hash, day, endpoint) "
+                "DO UPDATE SET units=units+excluded.units, calls=calls+1",
+                (self.key_hash(api_key), pacific_day(), endpoint, int(units)))
+            self._db.commit()
+
+    def mark_exhausted(self, api_key):
+        """API melapor quotaExceeded → sisa kuota hari ini dianggap 0 (tanpa perlu tahu batasnya)."""
+        self.record(api_key, "quotaExceeded", 0)
+
+    def exhausted(self, api_key) -> bool:
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM quota_spend WHERE key_hash=? AND day=? AND endpoint='quotaExceeded'",
+                                   (self.key_hash(api_key), pacific_day())).fetchone()
+        return row is not None
+
+    def spent(self, api_key) -> int:
+        with self._lock:
+            row = self._db.execute("SELECT COALESCE(SUM(units),0) FROM quota_spend WHERE key_hash=? AND day=?",
+                                   (self.key_hash(api_key), pacific_day())).fetchone()
+        return int(row[0])
+
+    def breakdown(self, api_key) -> dict:
+        with self._lock:
+            rows = self._db.execute("SELECT endpoint, units, calls FROM quota_spend WHERE key_hash=? AND day=?",
+                                    (self.key_hash(api_key), pacific_day())).fetchall()
+        return {ep: {"units": u, "calls": c} for ep, u, c in rows}
+
+    def totals_today(self) -> dict:
+        """{hash key (8 karakter): unit terpakai hari ini} untuk semua key — dipakai metrik Prometheus."""
+        with self._lock:
+            rows = self._db.execute("SELECT key_hash, SUM(units) FROM quota_spend WHERE day=? GROUP BY key_hash",
+                                    (pacific_day(),)).fetchall()
+        return {k[:8]: int(u) for k, u in rows}
+
+@process_singleton
+def quota_ledger():
+    return QuotaLedger(CACHE_DB)
+
+def quota_remaining(api_key, limit=QUOTA_DAILY_DEFAULT) -> int:
+    if quota_ledger().exhausted(api_key): return 0
+    return max(0, int(limit) - quota_ledger().spent(api_key))
+
+def api_get(url, params, ttl=None, cache_only=False, revalidate=False):
+    """GET JSON lewat session bersama; bila `ttl` diisi, respons sukses disimpan di cache persisten.
+    `revalidate` = payload + ETag disimpan tapi tidak pernah disajikan segar: selalu ke jaringan dengan If-None-Match
+    (videos.list — kesegarannya sudah diatur VideoStore, di sini hanya menghemat unduhan batch yang tidak berubah).
+    Setiap panggilan jaringan dicatat ke ledger kuota. `cache_only` = jangan keluar ke jaringan.
+    Request identik yang sedang berjalan di thread/sesi lain digabung (single-flight) → satu panggilan jaringan."""
+    k = ApiCache.make_key(url, params)
+    endpoint = url.rsplit("/", 1)[-1]
+    if ttl:
+        cached = api_cache().get(k)
+        metrics().inc("yt_api_cache_total", endpoint=endpoint, result="hit" if cached is not None else "miss")
+        if cached is not None: return cached
+    if cache_only:
+        raise QuotaExhausted("kuota hampir habis, hanya memakai cache")
+    return API_FLIGHT.do(k, lambda: _api_fetch(url, params, k if ttl or revalidate else None, ttl or 0, endpoint))
+
+def _api_fetch(url, params, k, ttl, endpoint):
+    """Satu GET jaringan. Untuk respons yang di-cache, ETag entri kedaluwarsa dikirim sebagai If-None-Match:
+    304 → payload lama dipakai lagi (tanpa unduh ulang) dan masa berlakunya diperpanjang."""
+    api_key = params.get("key", "")
+    stale = api_cache().stale(k) if k else None
+    headers = {"If-None-Match": stale[1]} if stale else None
+    try:
+        with metrics().timer("yt_api_seconds", endpoint=endpoint):
+            resp = http_session().get(url, params=params, headers=headers, timeout=HTTP_TIMEOUT)
+            r = None if resp.status_code == 304 else resp.json()
+    except Exception:
+        metrics().inc("yt_api_requests_total", endpoint=endpoint, outcome="network_error")
+        raise
+    # Content-Length = ukuran di kabel (terkompresi); resp.content sudah didekompresi requests
+    metrics().inc("yt_api_bytes_total", int(resp.headers.get("Content-Length") or len(resp.content)), endpoint=endpoint)
+    quota_ledger().record(api_key, endpoint, QUOTA_COST.get(url, 1))
+    if r is None:
+        metrics().inc("yt_api_requests_total", endpoint=endpoint, outcome="not_modified")
+        api_cache().set(k, stale[0], ttl, stale[1])
+        return stale[0]
+    if "error" in r:
+        reasons = {e.get("reason") for e in r["error"].get("errors", [])}
+        if "quotaExceeded" in reasons or "dailyLimitExceeded" in reasons:
+            metrics().inc("yt_api_requests_total", endpoint=endpoint, outcome="quota_exceeded")
+            quota_ledger().mark_exhausted(api_key)
+            raise QuotaExhausted(r["error"].get("message", "quotaExceeded"))
+        metrics().inc("yt_api_requests_total", endpoint=endpoint, outcome="error")
+        raise RuntimeError(r["error"].get("message", "YouTube API error"))
+    metrics().inc("yt_api_requests_total", endpoint=endpoint, outcome="ok")
+    metrics().inc("yt_quota_units_total", QUOTA_COST.get(url, 1), endpoint=endpoint)
+    if k: api_cache().set(k, r, ttl, r.get("etag") or resp.headers.get("ETag"))
+    return r
+
+def search_params(api_key, query, order, max_results, video_type_label="Semua", lang: str | None = None, region: str | None = None):
+    params = {
+        "part": "snippet",
+        "q": query,
+        "type": "video",
+        "order": order,
+        "maxResults": max_results,
+        "fields": SEARCH_FIELDS,
+        "key": api_key
+    }
+    if video_type_label == "Short":
+        params["videoDuration"] = "short"
+    elif video_type_label == "Live":
+        params["eventType"] = "live"
+    if lang: params["relevanceLanguage"] = lang
+    if region: params["regionCode"] = region
+    return params
+
+class PageBudget:
+    """Jatah halaman search.list non-cache yang dibagi semua thread varian (berbasis sisa kuota)."""
+    def __init__(self, pages):
+        self.left = int(pages)
+        self._lock = threading.Lock()
+
+    def take(self) -> bool:
+        with self._lock:
+            if self.left <= 0: return False
+            self.left -= 1
+            return True
+
+def iter_search_pages(api_key, query, order, per_page, video_type_label="Semua", lang: str | None = None, region: str | None = None,
+                      max_pages=1, cache_only=False, budget: PageBudget | None = None, stop: threading.Event | None = None):
+    """Generator halaman search.list: yield list ID per halaman sambil mengikuti nextPageToken
+    sampai `max_pages`, jatah `budget` habis, atau `stop` di-set. Halaman tidak ditahan di memori."""
+    token = None
+    for _ in range(max_pages):
+        if stop is not None and stop.is_set(): return
+        params = search_params(api_key, query, order, per_page, video_type_label, lang=lang, region=region)
+        if token: params["pageToken"] = token
+        if budget is not None and not api_cache().has(ApiCache.make_key(SEARCH_URL, params)) and not budget.take():
+            return
+        r = api_get(SEARCH_URL, params, ttl=CACHE_TTL_SEARCH, cache_only=cache_only)
+        yield [it["id"]["videoId"] for it in r.get("items",[]) if it.get("id",{}).get("videoId")]
+        token = r.get("nextPageToken")
+        if not token: return
+
+def yt_search_ids(api_key, query, order, max_results, video_type_label="Semua", lang: str | None = None, region: str | None = None, cache_only=False):
+    return next(iter_search_pages(api_key, query, order, max_results, video_type_label, lang=lang, region=region, cache_only=cache_only), [])
+
+class VideoStore:
+    """Detail video per ID: snippet+contentDetails (jarang berubah) disimpan terpisah dari statistics (sering berubah)."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS video_meta (id TEXT PRIMARY KEY, snippet TEXT NOT NULL, details TEXT NOT NULL, fetched REAL NOT NULL)")
+        self._db.execute("CREATE TABLE IF NOT EXISTS video_stats (id TEXT PRIMARY KEY, stats TEXT NOT NULL, fetched REAL NOT NULL)")
+        self._db.commit()
+
+    def load(self, ids):
+        """{id: {"snippet", "contentDetails", "statistics", "meta_at", "stats_at"}} untuk id yang tersimpan."""
+        out = {}
+        with self._lock:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i+500]
+                marks = ",".join("?" * len(chunk))
+                for vid, snip, det, at in self._db.execute(f"SELECT id, snippet, details, fetched FROM video_meta WHERE id IN ({marks})", chunk):
+                    out[vid] = {"snippet": json.loads(snip), "contentDetails": json.loads(det), "meta_at": at, "statistics": {}, "stats_at": 0.0}
+                for vid, stats, at in self._db.execute(f"SELECT id, stats, fetched FROM video_stats WHERE id IN ({marks})", chunk):
+                    if vid in out:
+                        out[vid]["statistics"], out[vid]["stats_at"] = json.loads(stats), at
+        return out
+
+    def description(self, vid):
+        """Deskripsi utuh satu video dari snippet tersimpan, atau None."""
+        with self._lock:
+            row = self._db.execute("SELECT snippet FROM video_meta WHERE id=?", (vid,)).fetchone()
+        return json.loads(row[0]).get("description", "") if row else None
+
+    def save_items(self, items, fetched=None):
+        """Simpan item videos.list; bagian yang tidak diminta (mis. part=statistics saja) tidak menimpa meta.
+        `fetched` = waktu payload diambil dari API (payload dari cache lebih tua dari sekarang)."""
+        now = fetched or time.time()
+        with self._lock:
+            for it in items:
+                vid = it.get("id")
+                if not vid: continue
+                if "snippet" in it:
+                    self._db.execute("INSERT OR REPLACE INTO video_meta VALUES (?,?,?,?)",
+                                     (vid, json.dumps(it["snippet"], ensure_ascii=False), json.dumps(it.get("contentDetails", {})), now))
+                if "statistics" in it:
+                    self._db.execute("INSERT OR REPLACE INTO video_stats VALUES (?,?,?)", (vid, json.dumps(it["statistics"]), now))
+            self._db.commit()
+
+@process_singleton
+def video_store():
+    return VideoStore(CACHE_DB)
+
+@functools.lru_cache(maxsize=64)
+def video_description(vid):
+    """Deskripsi utuh (popup, prompt AI); beberapa yang terakhir dibuka disimpan di memori proses."""
+    return video_store().description(vid)
+
+class SnapshotStore:
+    """Deret waktu views append-only: (video_id, ts, views). PK (video_id, ts) WITHOUT ROWID → baris satu video
+    berdampingan di B-tree, jadi cari snapshot pada/di dekat waktu tertentu = satu range seek, tetap cepat
+    walau ada jutaan baris. Snapshot lebih tua dari SNAPSHOT_RETENTION dipangkas berkala."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS view_snapshots (video_id TEXT NOT NULL, ts REAL NOT NULL, views INTEGER NOT NULL, "
+                         "PRIMARY KEY (video_id, ts)) WITHOUT ROWID")
+        self._db.execute("CREATE INDEX IF NOT EXISTS view_snapshots_ts ON view_snapshots (ts)")
+        self._db.commit()
+        self._pruned_at = 0.0
+
+    def record(self, items, now=None):
+        """Catat viewCount dari item videos.list (statistik segar dari API). Dibulatkan per menit → dobel diabaikan."""
+        now = now or time.time()
+        ts = float(int(now) // 60 * 60)
+        rows = [(it["id"], ts, int(it["statistics"]["viewCount"])) for it in items
+                if it.get("id") and it.get("statistics", {}).get("viewCount") is not None]
+        with self._lock:
+            if rows:
+                self._db.executemany("INSERT OR IGNORE INTO view_snapshots VALUES (?,?,?)", rows)
+            if now - self._pruned_at > 3600:
+                self._db.execute("DELETE FROM view_snapshots WHERE ts < ?", (now - SNAPSHOT_RETENTION,))
+                self._pruned_at = now
+            self._db.commit()
+
+    def velocity(self, points: dict, windows=VELOCITY_WINDOWS) -> dict:
+        """points {video_id: (ts, views) terkini} → {video_id: {nama_jendela: views/jam | None}}.
+        Baseline = snapshot terakhir sebelum (ts − jendela) tapi tidak lebih tua dari SNAPSHOT_MAX_AGE × jendela; bila
+        riwayat lebih pendek, snapshot tertua yang masih ≥ SNAPSHOT_MIN_SPAN lebih awal. None = riwayat belum cukup
+        atau hanya ada snapshot basi (rata-rata berhari-hari bukan laju jendela ini)."""
+        out = {}
+        with self._lock:
+            for vid, (t1, v1) in points.items():
+                res = {}
+                for name, w in windows.items():
+                    row = self._db.execute("SELECT ts, views FROM view_snapshots WHERE video_id=? AND ts<=? AND ts>=? "
+                                           "ORDER BY ts DESC LIMIT 1", (vid, t1 - w, t1 - SNAPSHOT_MAX_AGE * w)).fetchone()
+                    if row is None:
+                        row = self._db.execute("SELECT ts, views FROM view_snapshots WHERE video_id=? AND ts>? AND ts<=? ORDER BY ts LIMIT 1",
+                                               (vid, t1 - w, t1 - SNAPSHOT_MIN_SPAN)).fetchone()
+                    res[name] = round(max(0, v1 - row[1]) * 3600 / (t1 - row[0]), 2) if row else None
+                out[vid] = res
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            n, vids = self._db.execute("SELECT COUNT(*), COUNT(DISTINCT video_id) FROM view_snapshots").fetchone()
+        return {"snapshots": n, "videos": vids}
+
+@process_singleton
+def snapshot_store():
+    return SnapshotStore(CACHE_DB)
+
+def attach_velocity(records, points: dict):
+    """Isi vel6/vel24 record dari snapshot; dihitung sekali saat record dibuat, sort hanya membaca atribut."""
+    if not points: return records
+    with metrics().timer("yt_stage_seconds", stage="velocity"):
+        vel = snapshot_store().velocity(points)
+    for r in records:
+        for name, val in vel.get(r.id, {}).items(): setattr(r, name, val)
+    return records
+
+class VideoRecord:
+    """Record video ringkas. publishedAt di-parse sekali (`ts`), durasi, tipe konten dan token judul+deskripsi
+    dihitung saat dibuat, jadi sort/filter/format tidak perlu parse ulang. Tetap bisa diakses seperti dict.
+    Hanya string yang memang dipakai bersama yang di-intern (judul, channel, token, label durasi/live) — string
+    ter-intern tidak pernah dibebaskan, jadi ID, URL thumbnail dan potongan deskripsi tidak. `description` hanya
+    DESC_PREVIEW karakter pertama (teks utuh lewat full_description()) dan token deskripsi maksimal DESC_TOKENS."""
+    __slots__ = ("id", "title", "channel", "channelId", "description", "publishedAt", "views", "thumbnail",
+                 "duration_sec", "duration", "live", "ts", "vph", "ctype", "tokens", "n_title", "vel6", "vel24", "dupes")
+    _FIELDS = frozenset(__slots__)
+
+    def __init__(self, vid, snip, stats, det):
+        intern = sys.intern
+        desc = snip.get("description","")
+        self.id = vid
+        self.title = intern(snip.get("title",""))
+        self.channel = intern(snip.get("channelTitle",""))
+        self.channelId = intern(snip.get("channelId",""))
+        self.description = desc[:DESC_PREVIEW]
+        self.publishedAt = snip.get("publishedAt","")
+        self.views = int(stats.get("viewCount", 0)) if stats.get("viewCount") else 0
+        self.thumbnail = (snip.get("thumbnails",{}).get("high") or {}).get("url","")
+        self.duration_sec = iso8601_to_seconds(det.get("duration", ""))
+        self.duration = intern(fmt_duration(self.duration_sec))
+        self.live = intern(snip.get("liveBroadcastContent","none"))
+        self.ts = parse_published(self.publishedAt)
+        self.vph = hitung_vph(self.views, self.ts)
+        # tipe untuk filter: sama dengan aturan filter_by_video_type (upcoming tidak masuk Short/Regular)
+        if self.live == "live": self.ctype = "Live"
+        elif self.live != "none": self.ctype = "Other"
+        else: self.ctype = "Short" if self.duration_sec <= 60 else "Regular"
+        title_tokens = _tokenize(self.title)
+        self.tokens = tuple(map(intern, title_tokens + _tokenize(desc)[:DESC_TOKENS]))  # token judul dulu: tokens[:n_title]
+        self.n_title = len(title_tokens)
+        self.vel6 = self.vel24 = None  # views/jam berjendela dari SnapshotStore (None = riwayat belum cukup)
+        self.dupes = None  # record near-duplicate yang diwakili record ini (None = belum melalui collapse_duplicates)
+
+    def full_description(self):
+        if len(self.description) < DESC_PREVIEW: return self.description
+        return video_description(self.id) or self.description
+
+    def nbytes(self):
+        """Perkiraan memori record ini (judul/channel ikut dihitung walau di-intern dan dipakai bersama)."""
+        return (sys.getsizeof(self) + sys.getsizeof(self.tokens)
+                + sum(sys.getsizeof(getattr(self, k)) for k in ("title", "channel", "channelId", "description", "thumbnail")))
+
+    def __getitem__(self, k):
+        if k not in self._FIELDS: raise KeyError(k)
+        return getattr(self, k)
+
+    def get(self, k, default=None):
+        return getattr(self, k, default) if k in self._FIELDS else default
+
+    def __contains__(self, k):
+        return k in self._FIELDS
+
+    def __repr__(self):
+        return f"VideoRecord({self.id!r}, {self.title[:40]!r})"
+
+def build_video_record(vid, snip, stats, det):
+    return VideoRecord(vid, snip, stats, det)
+
+def yt_videos_detail(api_key, ids:list, cache_only=False, errors: list | None = None):
+    """Detail video untuk `ids` (urutan dipertahankan). Hanya ID yang belum ada/kedaluwarsa yang diminta ke API:
+    meta basi → part lengkap, hanya statistik basi → part=statistics. Batch 50 ID dikirim paralel.
+    Bila batch gagal, data lama di store tetap dipakai."""
+    if not ids: return []
+    ids = list(dict.fromkeys(ids))
+    store = video_store()
+    rows = store.load(ids)
+    now = time.time()
+    need_full = [v for v in ids if v not in rows or now - rows[v]["meta_at"] > VIDEO_META_TTL]
+    need_stats = [v for v in ids if v in rows and v not in need_full and now - rows[v]["stats_at"] > VIDEO_STATS_TTL]
+    m = metrics()
+    m.inc("yt_video_store_total", len(ids) - len(need_full) - len(need_stats), result="hit")
+    m.inc("yt_video_store_total", len(need_full), result="miss")
+    m.inc("yt_video_store_total", len(need_stats), result="stale_stats")
+    failures = []
+
+    def run(full, stats_only):
+        jobs = [(VIDEO_PARTS_FULL, full[i:i+DETAIL_BATCH]) for i in range(0, len(full), DETAIL_BATCH)]
+        jobs += [("statistics", stats_only[i:i+DETAIL_BATCH]) for i in range(0, len(stats_only), DETAIL_BATCH)]
+        if not jobs: return
+        def fetch(job):
+            part, chunk = job
+            m.inc("yt_videos_batches_total", part="full" if "snippet" in part else "statistics")
+            fields = VIDEO_FIELDS_FULL if part == VIDEO_PARTS_FULL else VIDEO_FIELDS_STATS
+            return api_get(VIDEOS_URL, {"part": part, "id": ",".join(chunk), "fields": fields, "key": api_key},
+                           revalidate=True).get("items", [])
+        with ThreadPoolExecutor(max_workers=min(DETAIL_WORKERS, len(jobs))) as ex:
+            futs = [ex.submit(fetch, j) for j in jobs]
+            for fut in as_completed(futs):
+                try:
+                    items = fut.result()
+                    store.save_items(items)
+                    snapshot_store().record(items)
+                except Exception as e:
+                    failures.append(e)
+                    if errors is not None: errors.append(f"videos.list: {e}")
+
+    if (need_full or need_stats) and not cache_only:
+        # ID yang sedang diambil sesi/thread lain tidak diminta ulang: tunggu lalu baca dari store
+        own_full, waits = DETAIL_FLIGHT.claim(need_full)
+        own_stats, waits_s = DETAIL_FLIGHT.claim(need_stats)
+        owned = set(own_full) | set(own_stats)
+        try:
+            run(own_full, own_stats)
+        finally:
+            DETAIL_FLIGHT.release(own_full + own_stats)
+        for ev in waits + waits_s: ev.wait(DETAIL_WAIT)
+        rows = store.load(ids)
+        retry = [v for v in need_full if v not in owned and v not in rows]  # pemilik lain gagal → ambil sendiri
+        if retry:
+            run(retry, [])
+            rows = store.load(ids)
+    if failures and not rows:
+        raise failures[0]
+    records = [build_video_record(v, rows[v]["snippet"], rows[v]["statistics"], rows[v]["contentDetails"]) for v in ids if v in rows]
+    return attach_velocity(records, {r.id: (rows[r.id]["stats_at"], r.views) for r in records if rows[r.id]["stats_at"]})
+
+def get_trending(api_key, max_results=15):
+    params = {"part":VIDEO_PARTS_FULL,"chart":"mostPopular","regionCode":"US","maxResults":max_results,"fields":VIDEO_FIELDS_FULL,"key":api_key}
+    k = ApiCache.make_key(VIDEOS_URL, params)
+    fresh = not api_cache().has(k)
+    items = api_get(VIDEOS_URL, params, ttl=CACHE_TTL_STATS).get("items",[])
+    # views di payload berlaku pada waktu fetch-nya, bukan sekarang (payload cache bisa berumur hingga CACHE_TTL_STATS)
+    at = api_cache().fetched_at(k, CACHE_TTL_STATS) or time.time()
+    # payload chart sudah lengkap → langsung masuk store, tanpa videos.list kedua
+    video_store().save_items(items, fetched=at)
+    if fresh: snapshot_store().record(items, now=at)  # payload dari cache bukan observasi baru
+    records = [build_video_record(it["id"], it.get("snippet",{}), it.get("statistics",{}), it.get("contentDetails",{})) for it in items if it.get("id")]
+    return attach_velocity(records, {r.id: (at, r.views) for r in records})
+
+# ---------------- Relevance helpers ----------------
+def _tokenize(txt: str):
+    return [w for w in re.split(r"[^\w]+", (txt or "").lower()) if len(w) >= 3 and w not in STOPWORDS]
+
+# BM25F: tf tiap field dinormalisasi panjang field-nya sendiri, lalu digabung berbobot sebelum saturasi k1
+BM25_K1 = 1.2
+BM25_FIELDS = {"title": (3.0, 0.5), "desc": (1.0, 0.75)}  # field: (bobot, b)
+BM25_VARIANT_WEIGHT = 0.6  # token dari varian terjemahan leksikon, relatif terhadap token keyword asli
+BM25_QUERY_CACHE = 8       # skor keyword terakhir yang disimpan per index
+
+@functools.lru_cache(maxsize=128)
+def bm25_query(keyword: str):
+    """((term, bobot), ...): token keyword asli (1.0) + token frase varian multibahasa (BM25_VARIANT_WEIGHT)."""
+    terms = dict.fromkeys(_tokenize(keyword), 1.0)
+    for q, _ in expand_keyword_variants(keyword)[1:]:
+        for t in _tokenize(q): terms.setdefault(t, BM25_VARIANT_WEIGHT)
+    return tuple(terms.items())
+
+# ---------------- Term index (satu tokenisasi per set hasil) ----------------
+TFIDF_TITLE_BOOST = 2   # kemunculan di judul dihitung 2× pada TF
+TERM_INDEX_CACHE = 4    # set hasil terakhir (lintas sesi) yang index-nya disimpan
+
+class TermIndex:
+    """Kosakata + matriks term-frequency sparse (CSR: indptr/indices/counts, plus title_counts) untuk satu set hasil,
+    dibangun dari token VideoRecord tanpa regex ulang. Bobot TF-IDF per entri = (1 + log tf)·idf, tf = kemunculan
+    dengan judul ×TFIDF_TITLE_BOOST, idf = log((1+N)/(1+df)) + 1, dinormalisasi L2 per video.
+    Transpose-nya (posting per term: video, tf judul, tf deskripsi) = inverted index untuk BM25.
+    Semua metode menerima/mengembalikan data per video (urutan bebas), dipetakan lewat ID."""
+    def __init__(self, videos):
+        import numpy as np
+        self.vocab, self.row = {}, {}
+        indptr, indices, counts, title_counts, lengths = [0], [], [], [], []
+        for v in videos:
+            if v.id in self.row: continue
+            self.row[v.id] = len(indptr) - 1
+            lengths.append((v.n_title, len(v.tokens) - v.n_title))
+            tc = Counter(v.tokens[:v.n_title])
+            for t, c in Counter(v.tokens).items():
+                indices.append(self.vocab.setdefault(t, len(self.vocab)))
+                counts.append(c); title_counts.append(tc.get(t, 0))
+            indptr.append(len(indices))
+        self.terms = list(self.vocab)
+        self.n_docs = n = len(indptr) - 1
+        self.indptr = np.asarray(indptr, dtype=np.int64)
+        self.indices = np.asarray(indices, dtype=np.int32)
+        self.counts = np.asarray(counts, dtype=np.int32)
+        self.title_counts = np.asarray(title_counts, dtype=np.int32)
+        self.doc = np.repeat(np.arange(n, dtype=np.int32), np.diff(self.indptr))  # baris tiap entri
+        self.df = np.bincount(self.indices, minlength=len(self.terms))
+        self.idf = np.log((1 + n) / (1 + self.df)) + 1
+        w = (1 + np.log(self.counts + (TFIDF_TITLE_BOOST - 1) * self.title_counts)) * self.idf[self.indices]
+        norm = np.sqrt(np.bincount(self.doc, weights=w * w, minlength=n))
+        self.weights = w / np.where(norm > 0, norm, 1)[self.doc]
+        # inverted index: entri CSR diurutkan per term → posting term t = [post_ptr[t], post_ptr[t+1])
+        by_term = np.argsort(self.indices, kind="stable")
+        self.post_ptr = np.concatenate(([0], np.cumsum(self.df)))
+        self.post_doc = self.doc[by_term]
+        self.post_tf = {"title": self.title_counts[by_term], "desc": (self.counts - self.title_counts)[by_term]}
+        lengths = np.asarray(lengths, dtype=np.float64).reshape(-1, 2)
+        self.field_len = {"title": lengths[:, 0], "desc": lengths[:, 1]}
+        self._bm25 = OrderedDict()
+
+    def rows(self, videos):
+        import numpy as np
+        return np.fromiter((self.row[v.id] for v in videos), dtype=np.int64, count=len(videos))
+
+    def covers(self, videos):
+        return all(v.id in self.row for v in videos)
+
+    def top_terms(self, k, videos=None, min_len=3):
+        """Term berbobot TF-IDF tertinggi (dijumlah atas `videos`, default semua)."""
+        import numpy as np
+        mask = slice(None) if videos is None or len(videos) == self.n_docs else np.isin(self.doc, self.rows(videos))
+        score = np.bincount(self.indices[mask], weights=self.weights[mask], minlength=len(self.terms))
+        out = []
+        for t in np.argsort(-score, kind="stable"):
+            if score[t] <= 0 or len(out) >= k: break
+            if len(self.terms[t]) >= min_len: out.append(self.terms[t])
+        return out
+
+    def doc_terms(self, v, k, min_len=3):
+        """Term TF-IDF tertinggi satu video."""
+        import numpy as np
+        a, b = self.indptr[self.row[v.id]], self.indptr[self.row[v.id] + 1]
+        order = a + np.argsort(-self.weights[a:b], kind="stable")
+        return [t for t in (self.terms[self.indices[i]] for i in order) if len(t) >= min_len][:k]
+
+    def bm25(self, keyword, videos):
+        """Skor BM25F per video untuk keyword (0 = tidak ada term query sama sekali).
+        Tiap term query = satu irisan posting; skor semua video set ini di-cache per keyword."""
+        import numpy as np
+        scores = self._bm25.get(keyword)
+        if scores is None:
+            scores = np.zeros(self.n_docs)
+            norm = {f: 1 - b + b * self.field_len[f] / max(self.field_len[f].mean(), 1.0) for f, (_, b) in BM25_FIELDS.items()}
+            for term, qw in bm25_query(keyword):
+                t = self.vocab.get(term)
+                if t is None: continue
+                a, b = self.post_ptr[t], self.post_ptr[t + 1]
+                docs = self.post_doc[a:b]
+                tf = sum(w * self.post_tf[f][a:b] / norm[f][docs] for f, (w, _) in BM25_FIELDS.items())
+                idf = math.log(1 + (self.n_docs - self.df[t] + 0.5) / (self.df[t] + 0.5))
+                scores[docs] += qw * idf * tf * (BM25_K1 + 1) / (tf + BM25_K1)
+            self._bm25[keyword] = scores
+            while len(self._bm25) > BM25_QUERY_CACHE: self._bm25.popitem(last=False)
+        return scores[self.rows(videos)]
+
+class TermIndexCache:
+    """LRU kecil TermIndex per set ID video (urutan tidak berpengaruh), dipakai bersama semua sesi.
+    Subset (hasil filter/halaman) memakai index set penuhnya bila sudah ada, jadi IDF tetap dari seluruh hasil."""
+    def __init__(self, size=TERM_INDEX_CACHE):
+        self._lock = threading.Lock()
+        self._lru = OrderedDict()
+        self.size = size
+
+    def get(self, videos) -> TermIndex:
+        key = frozenset(v.id for v in videos)
+        with self._lock:
+            if key in self._lru:
+                self._lru.move_to_end(key)
+                return self._lru[key]
+            for idx in reversed(self._lru.values()):
+                if idx.n_docs >= len(key) and idx.covers(videos): return idx
+        with metrics().timer("yt_stage_seconds", stage="term_index"):
+            idx = TermIndex(videos)
+        with self._lock:
+            self._lru[key] = idx
+            while len(self._lru) > self.size: self._lru.popitem(last=False)
+        return idx
+
+@process_singleton
+def term_indexes():
+    return TermIndexCache()
+
+def term_index(videos) -> TermIndex:
+    """Index set hasil; panggil sekali saat hasil datang agar sort/filter/ringkasan berikutnya tinggal lookup."""
+    return term_indexes().get(videos)
+
+def video_terms(v, k, min_len=3):
+    """Kata kunci satu video dari TF-nya sendiri (judul diberi bobot lebih). Sengaja tidak bergantung pada set hasil:
+    dipakai di prompt AI yang di-hash sebagai kunci cache, jadi harus stabil per video."""
+    return TermIndex([v]).doc_terms(v, k, min_len)
+
+# ---------------- Near-duplicate (re-upload / kompilasi lintas varian) ----------------
+DUP_PERMS = 40               # panjang signature MinHash
+DUP_BANDS = 10               # LSH 10 band × 4 baris: pasangan dengan Jaccard 0.7 jadi kandidat ≈94%
+DUP_TITLE_SIM = 0.7          # kemiripan judul (estimasi Jaccard 3-gram) minimum lintas channel
+DUP_TITLE_SIM_CHANNEL = 0.5  # channel sama + durasi sama → ambang lebih longgar
+DUP_DURATION_TOL = 0.03      # selisih durasi relatif maksimum (minimal 2 detik)
+DUP_BUCKET_PAIRS = 64        # bucket lebih besar dibandingkan ke anggota pertama saja, bukan semua pasangan
+DUP_CHANNEL_WINDOW = 16      # tetangga durasi per video dalam satu channel (Shorts 58–60 dtk tidak jadi O(m²))
+DUP_SIM_SLACK = 0.15         # estimasi MinHash hanya penyaring; keputusan akhir = Jaccard eksak ≥ ambang
+_MERSENNE = (1 << 31) - 1
+
+@functools.lru_cache(maxsize=1)
+def _minhash_coeffs():
+    import numpy as np
+    rng = np.random.default_rng(20240601)
+    return (rng.integers(1, _MERSENNE, DUP_PERMS, dtype=np.uint64), rng.integers(0, _MERSENNE, DUP_PERMS, dtype=np.uint64))
+
+def _title_shingles(title: str) -> set:
+    t = " ".join(re.split(r"[\W_]+", unicodedata.normalize("NFC", title).lower())).strip()
+    return {t[i:i+3] for i in range(max(1, len(t) - 2))}
+
+def minhash_signatures(titles, chunk=1000):
+    """Matriks (n, DUP_PERMS) MinHash atas 3-gram karakter judul ternormalisasi; hash universal (a·h + b) mod 2³¹−1.
+    Per potongan `chunk` judul: satu matriks hash semua shingle, lalu minimum per judul via reduceat."""
+    import numpy as np
+    a, b = _minhash_coeffs()
+    sig = np.empty((len(titles), DUP_PERMS), dtype=np.uint64)
+    for c0 in range(0, len(titles), chunk):
+        hashes, starts = [], []
+        for t in titles[c0:c0 + chunk]:
+            starts.append(len(hashes))
+            hashes.extend(zlib.crc32(g.encode()) for g in _title_shingles(t))  # stabil lintas proses (hash() di-salt)
+        h = np.array(hashes, dtype=np.uint64)
+        sig[c0:c0 + len(starts)] = np.minimum.reduceat((np.multiply.outer(h, a) + b) % _MERSENNE, starts, axis=0)
+    return sig
+
+@functools.lru_cache(maxsize=DUP_BUCKET_PAIRS)
+def _triu_pairs(k):
+    import numpy as np
+    return np.triu_indices(k, 1)
+
+def _title_numbers(title: str) -> frozenset:
+    return frozenset(re.findall(r"\d+", title))
+
+def duplicate_clusters(videos) -> list:
+    """Indeks record per cluster near-duplicate (termasuk cluster satu anggota), urut kemunculan pertama.
+    Kandidat = pasangan sebucket LSH atas signature judul + pasangan channel sama berdurasi mirip; kandidat
+    digabung bila durasi mirip, angka di judul sama ("Vol 1" ≠ "Vol 2", "432Hz" ≠ "528Hz"), dan kemiripan
+    judul lolos ambang: estimasi MinHash menyaring (tervektorisasi), Jaccard 3-gram eksak memutuskan.
+    Tidak ada perbandingan O(n²): bucket besar dan jendela per channel dibatasi."""
+    import numpy as np
+    n = len(videos)
+    if n < 2: return [[i] for i in range(n)]
+    sig = minhash_signatures([v.title for v in videos])
+    dur = np.fromiter((v.duration_sec for v in videos), dtype=np.int64, count=n)
+    num_ids = {}
+    nums = np.fromiter((num_ids.setdefault(_title_numbers(v.title), len(num_ids)) for v in videos), dtype=np.int64, count=n)
+
+    def bucket_pairs(members):
+        m = np.asarray(members)
+        if len(m) > DUP_BUCKET_PAIRS:  # bucket raksasa (judul generik): cukup ke anggota pertama
+            return np.full(len(m) - 1, m[0]), m[1:]
+        i, j = _triu_pairs(len(m))
+        return m[i], m[j]
+
+    def dur_ok(i, j):
+        return np.abs(dur[i] - dur[j]) <= np.maximum(2, DUP_DURATION_TOL * np.maximum(dur[i], dur[j]))
+
+    shingles = {}
+    def jaccard(i, j):
+        a = shingles.get(i) or shingles.setdefault(i, _title_shingles(videos[i].title))
+        b = shingles.get(j) or shingles.setdefault(j, _title_shingles(videos[j].title))
+        return len(a & b) / len(a | b)
+
+    def passing(pairs, threshold):
+        if not pairs: return []
+        i, j = (np.concatenate(x) for x in zip(*pairs))  # pasangan yang muncul di beberapa band cukup dicek ulang
+        ok = dur_ok(i, j) & (nums[i] == nums[j]) & ((sig[i] == sig[j]).mean(axis=1) >= threshold - DUP_SIM_SLACK)
+        return ((a, b) for a, b in zip(i[ok].tolist(), j[ok].tolist()) if jaccard(a, b) >= threshold)
+
+    rows = DUP_PERMS // DUP_BANDS
+    title_pairs = []
+    for band in range(DUP_BANDS):
+        buckets = {}
+        for idx, key in enumerate(sig[:, band * rows:(band + 1) * rows]):
+            buckets.setdefault(key.tobytes(), []).append(idx)
+        title_pairs += [bucket_pairs(m) for m in buckets.values() if len(m) > 1]
+    by_channel = {}
+    for idx, v in enumerate(videos):
+        if v.channelId: by_channel.setdefault(v.channelId, []).append(idx)
+    channel_pairs = []
+    for members in by_channel.values():  # jendela geser atas durasi terurut, maksimal DUP_CHANNEL_WINDOW tetangga
+        m = np.asarray(sorted(members, key=lambda x: dur[x]))
+        for k in range(1, min(len(m), DUP_CHANNEL_WINDOW + 1)):
+            ok = dur_ok(m[:-k], m[k:])
+            if not ok.any(): break
+            channel_pairs.append((m[:-k][ok], m[k:][ok]))
+
+    parent = list(range(n))
+    def find(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]; x = parent[x]
+        return x
+    for pairs, threshold in ((title_pairs, DUP_TITLE_SIM), (channel_pairs, DUP_TITLE_SIM_CHANNEL)):
+        for i, j in passing(pairs, threshold):
+            ri, rj = find(i), find(j)
+            if ri != rj: parent[max(ri, rj)] = min(ri, rj)
+
+    clusters = {}
+    for x in range(n): clusters.setdefault(find(x), []).append(x)
+    return list(clusters.values())
+
+def collapse_duplicates(videos):
+    """Satu record per cluster: perwakilan = views terbanyak, anggota lain di `dupes`. Urutan kemunculan dipertahankan."""
+    if not videos: return videos
+    with metrics().timer("yt_stage_seconds", stage="dedupe"):
+        out = []
+        for idx in duplicate_clusters(videos):
+            members = [videos[i] for i in idx]
+            rep = max(members, key=lambda v: v.views)
+            for v in members: v.dupes = ()
+            rep.dupes = tuple(v for v in members if v is not rep)
+            out.append(rep)
+    metrics().inc("yt_duplicates_collapsed_total", len(videos) - len(out))
+    return out
+
+def with_duplicate_ids(videos) -> list:
+    """ID perwakilan diikuti ID duplikatnya (untuk disimpan; collapse_duplicates menyusunnya kembali)."""
+    return [i for v in videos for i in (v.id, *(d.id for d in v.dupes or ()))]
+
+# ---------------- Sort & Filter ----------------
+def map_sort_option(sort_option: str):
+    if sort_option == "Paling Banyak Ditonton": return "viewCount"
+    if sort_option == "Terbaru": return "date"
+    if sort_option == "Paling Relevan": return "relevance"
+    if sort_option == "VPH Tertinggi": return "date"
+    if sort_option == "Velocity 24 Jam": return "date"
+    return "relevance"
+
+# urutan kunci per mode sort (kunci pertama = prioritas utama), semua menurun
+SORT_KEYS = {
+    "VPH Tertinggi": ("vph", "ts", "views", "rel"),
+    "Terbaru": ("ts", "vph", "views", "rel"),
+    "Paling Banyak Ditonton": ("views", "vph", "ts", "rel"),
+    "Paling Relevan": ("rel", "vph", "ts", "views"),
+    "Velocity 24 Jam": ("vel24", "vph", "ts", "views"),
+}
+
+def video_columns(items, keyword: str = "", with_rel: bool = True):
+    """Kolom NumPy dari VideoRecord untuk sort/filter tervektorisasi."""
+    import numpy as np  # lazy: hanya dibutuhkan setelah ada hasil pencarian
+    n = len(items)
+    cols = {
+        "vph": np.fromiter((v.vph for v in items), dtype=np.float64, count=n),
+        "ts": np.fromiter((v.ts for v in items), dtype=np.float64, count=n),
+        "views": np.fromiter((v.views for v in items), dtype=np.int64, count=n),
+        # riwayat snapshot belum cukup → pakai VPH seumur hidup sebagai perkiraan
+        "vel24": np.fromiter((v.vph if v.vel24 is None else v.vel24 for v in items), dtype=np.float64, count=n),
+        "ctype": np.array([v.ctype for v in items], dtype=object),
+    }
+    if with_rel:
+        cols["rel"] = term_index(items).bm25(keyword, items) if keyword else np.zeros(n)
+    return cols
+
+def apply_client_sort(items, sort_option: str, keyword: str = ""):
+    keys = SORT_KEYS.get(sort_option)
+    if not keys or not items: return items
+    with metrics().timer("yt_stage_seconds", stage="sort"):
+        import numpy as np
+        cols = video_columns(items, keyword, with_rel="rel" in keys)
+        # lexsort: kunci terakhir = primer; dinegasi agar menurun, stabil seperti sorted(reverse=True)
+        order = np.lexsort(tuple(-cols[k] for k in reversed(keys)))
+        return [items[i] for i in order]
+
+def filter_by_video_type(items, video_type_label: str):
+    if video_type_label in ("Short", "Regular", "Live") and items:
+        import numpy as np
+        mask = video_columns(items, with_rel=False)["ctype"] == video_type_label
+        return [items[i] for i in np.flatnonzero(mask)]
+    return items
+
+# ---------------- Judul Generator ----------------
+def trim_to_100(text):
+    if len(text) <= 100: return text
+    trimmed = text[:100]
+    if " " in trimmed: trimmed = trimmed[:trimmed.rfind(" ")]
+    return trimmed
+
+def generate_titles_from_data(videos, sort_option):
+    if not videos: return []
+    if sort_option == "Paling Banyak Ditonton":
+        sorted_videos = sorted(videos, key=lambda x: x["views"], reverse=True)
+    elif sort_option == "Terbaru":
+        sorted_videos = sorted(videos, key=lambda x: x.ts, reverse=True)
+    elif sort_option == "VPH Tertinggi":
+        sorted_videos = sorted(videos, key=lambda x: x["vph"], reverse=True)
+    else:
+        sorted_videos = videos
+    top_titles = [v["title"] for v in sorted_videos[:5]]
+    rekomendasi = []
+    for i in range(len(top_titles)):
+        base = top_titles[i]
+        extra = top_titles[(i+1) % len(top_titles)]
+        combined = f"{base} | {extra}"
+        if len(combined) < 66: combined += " | Koleksi Lengkap"
+        rekomendasi.append(trim_to_100(combined))
+    gabungan = " • ".join(top_titles[:3])
+    if len(gabungan) < 66: gabungan += " | Terpopuler"
+    rekomendasi.append(trim_to_100(gabungan))
+    return [trim_to_100(t) for t in rekomendasi[:10]]
+
+# ---------------- Gemini helpers & tasks ----------------
+GEMINI_WORKERS = 4
+GEMINI_BATCH_VIDEOS = 8   # video per prompt untuk mode "satu tugas, banyak video"
+# Batas per model (free tier): (request/menit, token/menit, request/hari)
+GEMINI_LIMITS = {
+    "gemini-1.5-pro": (2, 32_000, 50),
+    "gemini-1.5-flash": (15, 1_000_000, 1500),
+    "gemini-1.5-flash-8b": (15, 1_000_000, 1500),
+}
+# turun ke model yang lebih murah bila kuota model aktif habis
+GEMINI_FALLBACK = {"gemini-1.5-pro": "gemini-1.5-flash", "gemini-1.5-flash": "gemini-1.5-flash-8b"}
+GEMINI_MAX_RETRIES = 3
+GEMINI_QUEUE_TIMEOUT = 30  # detik maksimal antre di rate limiter sebelum pindah model
+
+GEMINI_DEFAULT_MODEL = "gemini-1.5-flash-8b"
+GEMINI_QUOTA_MSG = "Batas Gemini tercapai di semua model. Fallback lokal."
+
+class GeminiQuotaError(RuntimeError):
+    pass
+
+def gemini_chain(model_name):
+    chain = []
+    while model_name and model_name not in chain:
+        chain.append(model_name); model_name = GEMINI_FALLBACK.get(model_name)
+    return chain
+
+class TokenBucket:
+    def __init__(self, capacity, per_minute):
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.rate = per_minute / 60.0
+        self.stamp = time.monotonic()
+
+    def _refill(self, now):
+        self.tokens = min(self.capacity, self.tokens + (now - self.stamp) * self.rate)
+        self.stamp = now
+
+    def wait_time(self, n, now) -> float:
+        self._refill(now)
+        n = min(n, self.capacity)
+        return 0.0 if self.tokens >= n else (n - self.tokens) / self.rate
+
+class GeminiRateLimiter:
+    """Rate limiter bersama (per proses) per model: bucket RPM & TPM + hitungan harian.
+    Request yang melebihi batas per menit diantre; kuota harian habis → model ditandai sampai hari Pacific berganti."""
+    def __init__(self, limits=GEMINI_LIMITS):
+        self._lock = threading.Lock()
+        self._limits = limits
+        self._rpm, self._tpm, self._day = {}, {}, {}
+
+    def _state(self, model):
+        if model not in self._rpm:
+            rpm, tpm, _ = self._limits.get(model, (10, 250_000, 1000))
+            self._rpm[model], self._tpm[model] = TokenBucket(rpm, rpm), TokenBucket(tpm, tpm)
+        day = self._day.get(model)
+        if not day or day["day"] != pacific_day():
+            self._day[model] = day = {"day": pacific_day(), "used": 0, "exhausted": False}
+        return self._rpm[model], self._tpm[model], day
+
+    def exhausted(self, model) -> bool:
+        with self._lock:
+            _, _, day = self._state(model)
+            return day["exhausted"] or day["used"] >= self._limits.get(model, (0, 0, 10**9))[2]
+
+    def acquire(self, model, tokens, timeout=GEMINI_QUEUE_TIMEOUT) -> bool:
+        """Ambil 1 request + `tokens` dari bucket, menunggu (antre) maks `timeout` detik."""
+        deadline = time.monotonic() + timeout
+        while True:
+            if self.exhausted(model): return False
+            with self._lock:
+                rpm, tpm, day = self._state(model)
+                now = time.monotonic()
+                wait = max(rpm.wait_time(1, now), tpm.wait_time(tokens, now))
+                if wait <= 0:
+                    rpm.tokens -= 1
+                    tpm.tokens -= min(tokens, tpm.capacity)
+                    day["used"] += 1
+                    return True
+            if now + wait > deadline: return False
+            time.sleep(min(wait, 1.0) + random.uniform(0, 0.05))
+
+    def throttle(self, model, seconds):
+        """429 per menit dari server → kosongkan bucket sehingga request berikutnya menunggu ± `seconds`."""
+        with self._lock:
+            rpm, _, _ = self._state(model)
+            rpm.tokens = -seconds * rpm.rate
+            rpm.stamp = time.monotonic()
+
+    def mark_daily_exhausted(self, model):
+        with self._lock:
+            self._state(model)[2]["exhausted"] = True
+
+    def snapshot(self):
+        with self._lock:
+            return {m: {"used": self._state(m)[2]["used"], "limit": lim[2], "exhausted": self._state(m)[2]["exhausted"]}
+                    for m, lim in self._limits.items()}
+
+@process_singleton
+def gemini_limiter():
+    return GeminiRateLimiter()
+
+def _is_rate_error(msg: str) -> bool:
+    m = msg.lower()
+    return "429" in m or "quota" in m or "rate limit" in m or "resource has been exhausted" in m
+
+def _is_daily_quota(msg: str) -> bool:
+    m = msg.lower()
+    return "perday" in m or "per day" in m or "daily" in m
+
+def _retry_after(msg: str, attempt: int) -> float:
+    """Jeda retry: pakai saran server bila ada, selain itu exponential backoff + jitter."""
+    found = re.search(r"retry in ([\d.]+)s|seconds:\s*(\d+)", msg)
+    base = float(found.group(1) or found.group(2)) if found else min(20.0, 2 ** attempt)
+    return base + random.uniform(0, 1.0)
+
+class GenaiKeyGate:
+    """genai.configure bersifat global per proses, sedangkan sesi bisa memakai key berbeda. Panggilan dengan key
+    yang sama boleh paralel; panggilan dengan key lain menunggu sampai semuanya selesai, baru configure ulang —
+    jadi tidak ada request yang terkirim dengan key sesi lain."""
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._key = None
+        self._active = 0
+
+    @contextlib.contextmanager
+    def use(self, api_key: str):
+        import google.generativeai as genai
+        with self._cond:
+            while self._active and self._key != api_key: self._cond.wait()
+            if self._key != api_key:
+                endpoint = {"transport": "rest", "client_options": {"api_endpoint": GEMINI_API_BASE}} if GEMINI_API_BASE else {}
+                genai.configure(api_key=api_key, **endpoint)
+                self._key = api_key
+            self._active += 1
+        try:
+            yield genai
+        finally:
+            with self._cond:
+                self._active -= 1
+                if not self._active: self._cond.notify_all()
+
+@process_singleton
+def genai_gate():
+    return GenaiKeyGate()
+
+@functools.lru_cache(maxsize=32)
+def gemini_model(api_key: str, model_name: str, json_mode: bool = False):
+    """GenerativeModel dibuat sekali per (key, model, mode) per proses, bukan setiap panggilan.
+    Hanya dipakai di dalam genai_gate().use(api_key)."""
+    import google.generativeai as genai
+    cfg = {"response_mime_type": "application/json"} if json_mode else None
+    return genai.GenerativeModel(model_name, generation_config=cfg)
+
+def gemini_call(api_key: str, model_name: str, prompt: str, json_mode: bool = False, retries: int = GEMINI_MAX_RETRIES):
+    """Panggilan Gemini tanpa session_state (aman dari thread) lewat rate limiter bersama.
+    429 per menit → backoff + jitter lalu coba lagi; kuota harian / antre terlalu lama → model berikutnya di
+    GEMINI_FALLBACK. Mengembalikan (teks, model_terpakai); GeminiQuotaError bila semua model habis.
+    Prompt identik (key + model + mode sama) yang sedang berjalan di sesi lain ditunggu, bukan dikirim ulang."""
+    key = (QuotaLedger.key_hash(api_key), model_name, json_mode, hashlib.sha1(prompt.encode("utf-8")).hexdigest())
+    return GEMINI_FLIGHT.do(key, lambda: _gemini_call(api_key, model_name, prompt, json_mode, retries))
+
+def _gemini_call(api_key, model_name, prompt, json_mode, retries):
+    limiter = gemini_limiter()
+    est_tokens = len(prompt) // 4 + 1024
+    for model in gemini_chain(model_name):
+        attempt = 0
+        while attempt <= retries:
+            if not limiter.acquire(model, est_tokens):
+                break
+            t0 = time.perf_counter()
+            try:
+                with genai_gate().use(api_key):
+                    resp = gemini_model(api_key, model, json_mode).generate_content(prompt)
+                metrics().observe("gemini_seconds", time.perf_counter() - t0, model=model)
+                metrics().inc("gemini_requests_total", model=model, outcome="ok")
+                return (resp.text if getattr(resp, "text", "") else ""), model
+            except Exception as e:
+                msg = str(e)
+                attempt += 1
+                metrics().inc("gemini_requests_total", model=model, outcome="rate_limited" if _is_rate_error(msg) else "error")
+                if _is_rate_error(msg):
+                    if _is_daily_quota(msg):
+                        limiter.mark_daily_exhausted(model)
+                        break
+                    delay = _retry_after(msg, attempt)
+                    limiter.throttle(model, delay)
+                    time.sleep(delay)
+                    continue
+                if attempt > retries: raise
+                time.sleep(_retry_after("", attempt))
+    raise GeminiQuotaError("Semua model Gemini mencapai batas kuota/rate limit.")
+
+def gemini_ready(api_key, model_name=GEMINI_DEFAULT_MODEL, status: dict | None = None) -> bool:
+    """Ada key dan masih ada model (aktif atau fallback-nya) yang belum habis kuota hariannya.
+    `status` (mis. st.session_state) diisi gemini_blocked / gemini_last_error / gemini_last_model."""
+    if not api_key: return False
+    ready = any(not gemini_limiter().exhausted(m) for m in gemini_chain(model_name))
+    if status is not None: status["gemini_blocked"] = not ready
+    return ready
+
+def gemini_generate(prompt: str, api_key, model_name=GEMINI_DEFAULT_MODEL, status: dict | None = None,
+                    retries: int = GEMINI_MAX_RETRIES, json_mode: bool = False) -> str:
+    status = {} if status is None else status
+    if not gemini_ready(api_key, model_name, status): return ""
+    try:
+        text, used = gemini_call(api_key, model_name, prompt, json_mode, retries)
+        status["gemini_last_model"] = used
+        return text
+    except GeminiQuotaError:
+        status["gemini_blocked"] = True
+        status["gemini_last_error"] = GEMINI_QUOTA_MSG
+        return ""
+    except Exception as e:
+        status["gemini_last_error"] = str(e)
+        return ""
+
+class AiStore:
+    """Hasil AI persisten lintas sesi, kunci = (video ID, tugas, model, hash prompt)."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS ai_results (video_id TEXT, task TEXT, model TEXT, prompt_hash TEXT, text TEXT NOT NULL, created REAL NOT NULL, PRIMARY KEY (video_id, task, model, prompt_hash))")
+        self._db.commit()
+
+    @staticmethod
+    def prompt_hash(prompt: str) -> str:
+        return hashlib.sha1(prompt.encode("utf-8")).hexdigest()
+
+    def get(self, vid, task, model, prompt):
+        with self._lock:
+            row = self._db.execute("SELECT text FROM ai_results WHERE video_id=? AND task=? AND model=? AND prompt_hash=?",
+                                   (vid, task, model, self.prompt_hash(prompt))).fetchone()
+        return row[0] if row else None
+
+    def set(self, vid, task, model, prompt, text):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO ai_results VALUES (?,?,?,?,?,?)",
+                             (vid, task, model, self.prompt_hash(prompt), text, time.time()))
+            self._db.commit()
+
+@process_singleton
+def ai_store():
+    return AiStore(CACHE_DB)
+
+class AiOutputCache:
+    """Hasil AI yang sedang ditampilkan, LRU lintas sesi dengan batas byte global dan per sesi (sys.getsizeof teks).
+    Entri yang tergusur tidak hilang: ai_cached() membacanya lagi dari AiStore saat dibutuhkan."""
+    def __init__(self, max_bytes=AI_MEM_GLOBAL, session_bytes=AI_MEM_SESSION):
+        self._lock = threading.Lock()
+        self.max_bytes, self.session_bytes = max_bytes, session_bytes
+        self._lru = OrderedDict()  # (sesi, video, tugas) → byte; urutan = akses terakhir, global
+        self._sessions = {}        # sesi → OrderedDict((video, tugas) → teks)
+        self._used = {}            # sesi → byte
+        self.bytes = self.evictions = 0
+
+    def session(self) -> "SessionAiCache":
+        """Handle untuk satu sesi Streamlit; entri sesi dibuang saat handle (session_state) di-GC."""
+        h = SessionAiCache(self, uuid.uuid4().hex)
+        weakref.finalize(h, self.drop, h.sid)
+        return h
+
+    def get(self, sid, vid, task):
+        with self._lock:
+            entries = self._sessions.get(sid)
+            if not entries or (vid, task) not in entries: return None
+            entries.move_to_end((vid, task))
+            self._lru.move_to_end((sid, vid, task))
+            return entries[(vid, task)]
+
+    def set(self, sid, vid, task, text):
+        if not text: return
+        size = sys.getsizeof(text)
+        with self._lock:
+            self._remove(sid, vid, task)
+            self._sessions.setdefault(sid, OrderedDict())[(vid, task)] = text
+            self._lru[(sid, vid, task)] = size
+            self._used[sid] = self._used.get(sid, 0) + size
+            self.bytes += size
+            while self._used[sid] > self.session_bytes and len(self._sessions[sid]) > 1:
+                self._remove(sid, *next(iter(self._sessions[sid])))
+                self.evictions += 1
+            while self.bytes > self.max_bytes and len(self._lru) > 1:
+                self._remove(*next(iter(self._lru)))
+                self.evictions += 1
+
+    def _remove(self, sid, vid, task):
+        size = self._lru.pop((sid, vid, task), None)
+        if size is None: return
+        entries = self._sessions[sid]
+        del entries[(vid, task)]
+        self._used[sid] -= size
+        self.bytes -= size
+        if not entries:
+            del self._sessions[sid], self._used[sid]
+
+    def drop(self, sid):
+        with self._lock:
+            for vid, task in list(self._sessions.get(sid, ())):
+                self._remove(sid, vid, task)
+
+    def stats(self, sid=None) -> dict:
+        with self._lock:
+            out = {"bytes": self.bytes, "entries": len(self._lru), "sessions": len(self._sessions),
+                   "evictions": self.evictions, "max_bytes": self.max_bytes}
+            if sid is not None:
+                out["session_bytes"], out["session_entries"] = self._used.get(sid, 0), len(self._sessions.get(sid, ()))
+        return out
+
+class SessionAiCache:
+    """Tampilan satu sesi atas AiOutputCache (disimpan di st.session_state.ai_cache)."""
+    __slots__ = ("_cache", "sid", "__weakref__")
+
+    def __init__(self, cache, sid):
+        self._cache, self.sid = cache, sid
+
+    def get(self, vid, task): return self._cache.get(self.sid, vid, task)
+    def set(self, vid, task, text): self._cache.set(self.sid, vid, task, text)
+    def stats(self): return self._cache.stats(self.sid)
+
+@process_singleton
+def ai_memory():
+    return AiOutputCache()
+
+def video_text(v) -> str:
+    """Deskripsi utuh untuk prompt/fallback AI (record hanya membawa cuplikan)."""
+    return v.full_description() if isinstance(v, VideoRecord) else v.get("description", "")
+
+def content_type(v):
+    if v.get("live") == "live": return "Live"
+    if v.get("duration_sec", 0) <= 60: return "Short"
+    return "Regular"
+
+# --- prompt & fallback lokal per tugas ---
+def _summary_prompt(v):
+    return f"Ringkas video YouTube berikut menjadi 5 bullet berbahasa Indonesia.\nJudul: {v['title']}\nChannel: {v.get('channel','')}\nDeskripsi:\n{video_text(v)[:3000]}"
+
+def _summary_fallback(v):
+    sentences = re.split(r'(?<=[.!?])\s+', video_text(v))[:5] or [v["title"]]
+    return "**Ringkasan (fallback lokal)**\n" + "\n".join(f"- {s}" for s in sentences)
+
+def _alt_titles_prompt(v):
+    ct, lang = content_type(v), detect_lang(v["title"])
+    return ((f"Write 10 alternative YouTube titles (≤100 chars) in ENGLISH for '{v['title']}'. " if lang=="en"
+             else f"Buat 10 judul alternatif (≤100 karakter) dalam BAHASA INDONESIA untuk '{v['title']}'. ")
+            + f"Mix styles, keep topic. Content format: {ct}. Numbered list.")
+
+def _alt_titles_fallback(v):
+    base, lang = v["title"], detect_lang(v["title"])
+    if lang == "en":
+        variants = [trim_to_100(base), trim_to_100(f"{base} | Full Guide"), trim_to_100(f"{base} (Tips & Tricks)"),
+                    trim_to_100(f"{base}: Step-by-Step"), trim_to_100(f"Master {base} in Minutes"),
+                    trim_to_100(f"{base} for Beginners"), trim_to_100(f"{base} Explained!"),
+                    trim_to_100(f"Top 5 {base} Hacks"), trim_to_100(f"{base} [2025 Update]"),
+                    trim_to_100(f"Why {base}? The Truth")]
+    else:
+        variants = [trim_to_100(base), trim_to_100(f"{base} | Panduan Lengkap"), trim_to_100(f"{base} (Tips & Trik)"),
+                    trim_to_100(f"{base}: Langkah demi Langkah"), trim_to_100(f"Kuasi {base} dalam Hitungan Menit"),
+                    trim_to_100(f"{base} untuk Pemula"), trim_to_100(f"{base} Tuntas!"),
+                    trim_to_100(f"5 Trik {base} Teratas"), trim_to_100(f"{base} [2025]"),
+                    trim_to_100(f"Kenapa {base}? Ini Alasannya")]
+    return "\n".join(f"{i+1}. {t}" for i, t in enumerate(variants[:10]))
+
+def _script_prompt(v):
+    return f"Buat kerangka skrip YouTube berbahasa Indonesia untuk '{v['title']}'. Format: {content_type(v)}. Sertakan HOOK, Intro, 3–6 poin utama, CTA. Untuk Live tambahkan agenda & interaksi chat."
+
+def _script_fallback(v):
+    ct = content_type(v)
+    return "HOOK → Intro → 3 Bagian → Rekap → CTA" if ct=="Regular" else \
+           "HOOK (0–3s) → Inti cepat (3–50s, 3 poin) → CTA (50–60s)" if ct=="Short" else \
+           "Opening • Agenda • Interaksi Chat • Checkpoint • Closing"
+
+def _thumbs_prompt(v):
+    title = v["title"]
+    kw = ", ".join(video_terms(v, 8, min_len=4))
+    return f"Buat 5 ide thumbnail berbahasa Indonesia untuk '{title}'. 1 baris/ide: konsep + gaya + komposisi + teks ≤3 kata. Sertakan 1 prompt (Midjourney-style). Kata kunci: {kw}."
+
+def _thumbs_fallback(v):
+    return "\n".join([
+        "Close-up objek + teks 2 kata\nPrompt: ultra-detailed close-up, dramatic lighting, high contrast",
+        "Before/After split screen\nPrompt: split-screen comparison, cinematic 16:9, big arrow",
+        "Wajah ekspresif menunjuk objek\nPrompt: person pointing, shallow depth, crisp label",
+        "Ikon minimalis + gradient\nPrompt: flat icon center, vivid gradient, clean type",
+        "Diagram 3 langkah\nPrompt: infographic 1-2-3, bright, bold numbers"
+    ])
+
+def _tags_prompt(v):
+    title, desc, lang = v["title"], video_text(v), detect_lang(v["title"])
+    return (("Generate comma-separated YouTube SEO tags in ENGLISH (≤500 chars). " if lang=="en"
+             else "Buat daftar tag SEO YouTube berbahasa INDONESIA (dipisahkan koma, ≤500 karakter). ")
+            + f"Use/Gunakan kata kunci dari judul & deskripsi.\nTitle/Judul: {title}\nDescription/Deskripsi: {desc[:1500]}")
+
+def _tags_fallback(v):
+    return ", ".join(video_terms(v, 40))[:500]
+
+AI_TASKS = {
+    "summary": (_summary_prompt, _summary_fallback),
+    "tags": (_tags_prompt, _tags_fallback),
+    "script": (_script_prompt, _script_fallback),
+    "alt_titles": (_alt_titles_prompt, _alt_titles_fallback),
+    "thumbs": (_thumbs_prompt, _thumbs_fallback),
+}
+
+def _parse_json_object(text: str) -> dict:
+    t = text or ""
+    try:
+        # toleran terhadap ```json fence``` atau teks pembuka di sekitar objek
+        d = json.loads(t[t.find("{"): t.rfind("}") + 1]) if "{" in t else {}
+    except ValueError:
+        return {}
+    out = {}
+    for k, val in (d.items() if isinstance(d, dict) else []):
+        out[str(k)] = "\n".join(str(x) for x in val) if isinstance(val, list) else str(val)
+    return out
+
+def ai_cached(v, task, api_key="", model_name=GEMINI_DEFAULT_MODEL):
+    """Hasil tersimpan (persisten) untuk (video, tugas) dari model aktif atau model fallback-nya, atau None."""
+    if not api_key: return None
+    prompt = AI_TASKS[task][0](v)
+    for model in gemini_chain(model_name):
+        text = ai_store().get(v["id"], task, model, prompt)
+        if text: return text
+    return None
+
+def ai_task(v, task, api_key="", model_name=GEMINI_DEFAULT_MODEL, status: dict | None = None):
+    """Satu tugas untuk satu video: cache persisten → Gemini → fallback lokal."""
+    status = {} if status is None else status
+    prompt_fn, fallback_fn = AI_TASKS[task]
+    if gemini_ready(api_key, model_name, status):
+        cached = ai_cached(v, task, api_key, model_name)
+        if cached: return cached
+        prompt = prompt_fn(v)
+        res = gemini_generate(prompt, api_key, model_name, status)
+        if res:
+            ai_store().set(v["id"], task, status.get("gemini_last_model", model_name), prompt, res)
+            return res
+    return fallback_fn(v)
+
+def ai_summary(v, **gemini): return ai_task(v, "summary", **gemini)
+def ai_alt_titles(v, **gemini): return ai_task(v, "alt_titles", **gemini)
+def ai_script_outline(v, **gemini): return ai_task(v, "script", **gemini)
+def ai_thumb_ideas(v, **gemini): return ai_task(v, "thumbs", **gemini)
+def ai_seo_tags(v, **gemini): return ai_task(v, "tags", **gemini)
+
+def _run_gemini_jobs(jobs, api_key, model_name, status: dict):
+    """Jalankan [(kunci, prompt)] paralel dengan output JSON; kembalikan {kunci: (dict, model)}."""
+    results = {}
+    with ThreadPoolExecutor(max_workers=min(GEMINI_WORKERS, max(1, len(jobs)))) as ex:
+        futs = {ex.submit(gemini_call, api_key, model_name, prompt, True): key for key, prompt in jobs}
+        for fut in as_completed(futs):
+            try:
+                text, used = fut.result()
+                results[futs[fut]] = (_parse_json_object(text), used)
+            except GeminiQuotaError:
+                status["gemini_blocked"] = True
+                status["gemini_last_error"] = GEMINI_QUOTA_MSG
+            except Exception as e:
+                status["gemini_last_error"] = str(e)
+    return results
+
+def ai_all_tasks(v, tasks=tuple(AI_TASKS), api_key="", model_name=GEMINI_DEFAULT_MODEL, status: dict | None = None) -> dict:
+    """Semua tugas untuk satu video dalam SATU prompt (output JSON). Yang sudah tersimpan tidak diminta ulang."""
+    status = {} if status is None else status
+    out = {t: ai_cached(v, t, api_key, model_name) for t in tasks}
+    todo = [t for t in tasks if not out[t]]
+    if todo and gemini_ready(api_key, model_name, status):
+        prompts = {t: AI_TASKS[t][0](v) for t in todo}
+        prompt = ("Kerjakan semua tugas berikut untuk video YouTube yang sama. Balas HANYA satu objek JSON "
+                  f"dengan kunci {', '.join(todo)}; nilai tiap kunci = hasil tugas itu sebagai string (boleh markdown).\n\n"
+                  + "\n\n".join(f"### {t}\n{p}" for t, p in prompts.items()))
+        res, used = _run_gemini_jobs([("all", prompt)], api_key, model_name, status).get("all", ({}, None))
+        for t, text in res.items():
+            if t in prompts and text:
+                out[t] = text
+                ai_store().set(v["id"], t, used, prompts[t], text)
+    return {t: out[t] or AI_TASKS[t][1](v) for t in tasks}
+
+def ai_task_many(videos, task, api_key="", model_name=GEMINI_DEFAULT_MODEL, status: dict | None = None) -> dict:
+    """Satu tugas untuk banyak video: {video_id: teks}. Video dikelompokkan per GEMINI_BATCH_VIDEOS dalam satu
+    prompt JSON, dan batch-batch dikirim paralel — N video ≈ N/8 panggilan, bukan N."""
+    status = {} if status is None else status
+    out = {v["id"]: ai_cached(v, task, api_key, model_name) for v in videos}
+    todo = [v for v in videos if not out[v["id"]]]
+    if todo and gemini_ready(api_key, model_name, status):
+        prompts = {v["id"]: AI_TASKS[task][0](v) for v in todo}
+        jobs = []
+        for i in range(0, len(todo), GEMINI_BATCH_VIDEOS):
+            chunk = todo[i:i+GEMINI_BATCH_VIDEOS]
+            jobs.append((i, "Kerjakan tugas yang sama untuk setiap video di bawah. Balas HANYA satu objek JSON "
+                            "dengan kunci = ID video dan nilai = hasil untuk video itu (string, boleh markdown).\n\n"
+                            + "\n\n".join(f"### {v['id']}\n{prompts[v['id']]}" for v in chunk)))
+        for res, used in _run_gemini_jobs(jobs, api_key, model_name, status).values():
+            for vid, text in res.items():
+                if vid in prompts and text:
+                    out[vid] = text
+                    ai_store().set(vid, task, used, prompts[vid], text)
+    return {v["id"]: out[v["id"]] or AI_TASKS[task][1](v) for v in videos}
+
+# ---------------- Niche summary (Tab Ide) ----------------
+def relevant_videos(videos, keyword, index: TermIndex | None = None):
+    if not keyword or not videos: return videos
+    rel = [v for v, score in zip(videos, (index or term_index(videos)).bm25(keyword, videos)) if score > 0]
+    return rel if rel else videos
+
+def format_share(videos):
+    s = sum(1 for v in videos if v.ctype == "Short")
+    l = sum(1 for v in videos if v.ctype == "Live")
+    r = len(videos) - s - l
+    return s, l, r
+
+def core_tokens(videos, topn=12, index: TermIndex | None = None):
+    """Topik kunci = term TF-IDF teratas; `index` = index set yang lebih besar yang memuat `videos` (IDF-nya dipakai)."""
+    if not videos: return []
+    return (index or term_index(videos)).top_terms(topn, videos)
+
+def format_label_from_tokens(tokens:set):
+    med_keys = {"432hz","meditation","meditasi","sleep","tidur","calm","relax","healing","anxiety","buddha","chakra","zen","mantra","sound","frequency"}
+    return "Meditasi / Healing Music 432Hz" if (tokens & med_keys) else "Niche berdasarkan kata kunci"
+
+def publish_hour_stats(videos):
+    hours=[]
+    for v in videos:
+        h = asia_jakarta_hour(v.ts)
+        if h is not None: hours.append(h)
+    if not hours: return {"avg": None, "top": []}
+    avg_h = round(mean(hours))
+    top = Counter(hours).most_common(3)
+    return {"avg": avg_h, "top": top}
+
+def views_stats(videos):
+    vs=[int(v.get("views",0)) for v in videos if isinstance(v.get("views",0), int)]
+    vph=[float(v.get("vph",0.0)) for v in videos]
+    return {"avg": int(mean(vs)) if vs else 0, "med": int(median(vs)) if vs else 0, "vph": round(mean(vph),2) if vph else 0.0, "n": len(videos)}
+
+def window_hour(h): return f"{h:02d}:00–{(h+1)%24:02d}:59"
+
+def render_niche_summary(videos, keyword: str, preview: bool = False) -> str:
+    """`preview` = hasil parsial selama fetch: tanpa dedupe (record bersama tidak diubah), tanpa TermIndex
+    dan tanpa metrik; relevansi = ada token keyword, topik = frekuensi token. Versi penuh dihitung sekali di akhir."""
+    if preview:
+        return _render_niche_summary(videos, keyword, preview=True)
+    with metrics().timer("yt_stage_seconds", stage="niche_summary"):
+        return _render_niche_summary(videos, keyword)
+
+def _preview_topics(videos, keyword, topn=12):
+    q = set(_tokenize(keyword)) if keyword else set()
+    vids = [v for v in videos if q.intersection(v.tokens)] if q else videos
+    vids = vids or videos
+    return vids, {t for t, _ in Counter(t for v in vids for t in v.tokens).most_common(topn)}
+
+def _render_niche_summary(videos, keyword: str, preview: bool = False) -> str:
+    if preview:
+        vids, tokens = _preview_topics(videos, keyword)
+    else:
+        if any(v.dupes is None for v in videos): videos = collapse_duplicates(list(videos))  # tiap cluster dihitung sekali
+        index = term_index(videos)
+        vids = relevant_videos(videos, keyword, index)
+        tokens = set(core_tokens(vids, topn=12, index=index))
+    s,l,r = format_share(vids)
+    label = format_label_from_tokens(tokens)
+    hrs = publish_hour_stats(vids)
+    stat = views_stats(vids)
+    if hrs["top"]:
+        top_list = ", ".join(f"{h:02d} (n={c})" for h,c in hrs["top"])
+        saran = ", ".join(window_hour(h) for h,_ in hrs["top"][:2])
+        jam_md = f"**Rata-rata:** {hrs['avg']:02d}:00 WIB • **Puncak:** {top_list}\n**Saran upload:** {saran}"
+    else:
+        jam_md = "Data jam publish tidak cukup."
+    fmt_md = f"Short: {s} • Live: {l} • Reguler: {r} (total {len(vids)})"
+    tok_md = ", ".join(sorted(list(tokens))[:12])
+    bullets = [
+        f"Niche: **{label}** • Format dominan → {('Reguler' if r>=max(s,l) else 'Short' if s>=max(l,r) else 'Live')}",
+        f"Sampel: **{stat['n']}** video • Rata-rata views **{format_views(stat['avg'])}** • Median **{format_views(stat['med'])}** • VPH rata-rata **{stat['vph']}**",
+        f"Topik kunci: {tok_md}",
+        f"Waktu publish efektif (WIB): {jam_md}",
+        "Strategi: konsisten format dominan + variasi (Short/Live) yang cepat perform."
+    ]
+    return ("### 📊 Ringkasan Niche (otomatis)\n"
+            f"- **Label:** {label}\n- **Distribusi Format:** {fmt_md}\n\n"
+            "### 🕒 Rata-rata Jam Publish (WIB)\n" + jam_md + "\n\n"
+            "### 📈 Metrik Ringkas\n"
+            f"- Sampel: **{stat['n']}** • Rata-rata Views: **{format_views(stat['avg'])}** • Median: **{format_views(stat['med'])}** • VPH: **{stat['vph']}**\n\n"
+            "### 📌 Rangkuman Ketat\n" + "\n".join(f"- {b}" for b in bullets))
+
+# ---------------- Derived analytics ----------------
+def result_fingerprint(videos, sort_option: str, keyword: str) -> str:
+    h = hashlib.sha1(f"{sort_option}\x1f{keyword}".encode("utf-8"))
+    for v in videos: h.update(b"\x1f" + v.id.encode("utf-8"))
+    return h.hexdigest()
+
+def global_tag_string(videos, limit=500) -> str:
+    """Tag gabungan: term TF-IDF teratas set hasil (judul diberi bobot lebih), sebanyak yang muat dalam `limit` karakter."""
+    if not videos: return ""
+    out, size = [], 0
+    for t in term_index(videos).top_terms(limit // 4, videos):
+        if size + len(t) + 2 * bool(out) > limit: break
+        out.append(t); size += len(t) + 2 * (len(out) > 1)
+    return ", ".join(out)
+
+def csv_rows(videos):
+    return [{
+        "Judul": v["title"], "Channel": v["channel"], "Views": v["views"], "VPH": v["vph"],
+        "Views/jam 6j": v.vel6, "Views/jam 24j": v.vel24,
+        "Tanggal (relatif)": format_rel_time(v.ts), "Jam Publish (UTC)": format_jam_utc(v.ts),
+        "Durasi": v.get("duration","-"), "Duplikat": len(v.dupes or ()), "Link": f"https://www.youtube.com/watch?v={v['id']}"
+    } for v in videos]
+
+def videos_dataframe(videos):
+    import pandas as pd
+    return pd.DataFrame(csv_rows(videos))
+
+# ---------------- Pencarian lintas bahasa ----------------
+def search_jobs(user_keyword, max_variants=10):
+    """Pasangan (query, bahasa, region) yang akan dicari untuk satu keyword."""
+    variants = expand_keyword_variants(user_keyword, max_variants=max_variants)
+    return [(q, lang, SEARCH_REGIONS[i % len(SEARCH_REGIONS)]) for i, (q, lang) in enumerate(variants)]
+
+def search_page_size(max_per_query, max_pages):
+    return max_per_query if max_pages <= 1 else SEARCH_PAGE_SIZE
+
+def estimate_search_cost(api_key, user_keyword, order, max_per_query, video_type_label, max_variants=10, max_pages=1, cap=UNION_CAP):
+    """Estimasi unit kuota sebelum pencarian: search.list yang belum ada di cache + batch videos.list."""
+    jobs = search_jobs(user_keyword, max_variants)
+    per_page = search_page_size(max_per_query, max_pages)
+    uncached = sum(1 for q, lang, region in jobs
+                   if not api_cache().has(ApiCache.make_key(SEARCH_URL, search_params(api_key, q, order, per_page, video_type_label, lang, region))))
+    n_ids = min(len(jobs) * per_page * max_pages, cap)
+    return {"variants": len(jobs), "uncached": uncached, "pages": max_pages,
+            "units": uncached * max_pages * QUOTA_COST[SEARCH_URL] + math.ceil(n_ids / DETAIL_BATCH) * QUOTA_COST[VIDEOS_URL]}
+
+def plan_search_budget(api_key, user_keyword, order, max_per_query, video_type_label, max_pages=1, cap=UNION_CAP, limit=QUOTA_DAILY_DEFAULT):
+    """Turunkan jumlah varian (dan region-nya) bila sisa kuota tidak cukup; bila sangat tipis → cache saja.
+    `page_budget` = jumlah halaman search.list non-cache yang masih boleh dipakai (untuk deep search)."""
+    remaining = quota_remaining(api_key, limit) - QUOTA_RESERVE
+    est = estimate_search_cost(api_key, user_keyword, order, max_per_query, video_type_label, max_pages=max_pages, cap=cap)
+    plan = {"max_variants": 10, "cache_only": False, "degraded": False, "estimate": est, "remaining": max(0, remaining),
+            "page_budget": max(0, remaining) // QUOTA_COST[SEARCH_URL]}
+    if est["units"] <= remaining:
+        return plan
+    plan["degraded"] = True
+    n_ids = min(est["variants"] * search_page_size(max_per_query, max_pages) * max_pages, cap)
+    affordable = (remaining - math.ceil(n_ids / DETAIL_BATCH) * QUOTA_COST[VIDEOS_URL]) // QUOTA_COST[SEARCH_URL]  # halaman search
+    if affordable < 1:
+        plan["cache_only"] = True
+        return plan
+    # varian yang sudah ada di cache gratis, jadi yang dipotong hanya sisa yang belum ter-cache. Utamakan jumlah varian
+    # yang semua halamannya terbayar; bila tidak ada, varian yang halaman pertamanya terbayar (lanjutan dipotong page_budget)
+    first_only = None
+    for n in range(est["variants"], 0, -1):
+        e = estimate_search_cost(api_key, user_keyword, order, max_per_query, video_type_label, max_variants=n, max_pages=max_pages, cap=cap)
+        if e["uncached"] * max_pages <= affordable:
+            plan["max_variants"], plan["estimate"] = n, e
+            return plan
+        if first_only is None and e["uncached"] <= affordable:
+            first_only = (n, e)
+    if first_only:
+        plan["max_variants"], plan["estimate"] = first_only
+    else:
+        plan["cache_only"] = True
+    return plan
+
+def search_multilang_union(api_key, user_keyword, order, max_per_query, video_type_label, errors: list | None = None,
+                           max_variants=10, cache_only=False, max_pages=1, cap=UNION_CAP):
+    """Cari banyak varian bahasa secara paralel & gabungkan ID unik (urutan varian tetap).
+    Varian yang gagal/timeout dilewati; pesan error-nya ditambahkan ke `errors` bila diberikan."""
+    ids = []
+    for ev in stream_search(api_key, user_keyword, order, max_per_query, video_type_label, errors=errors,
+                            max_variants=max_variants, cache_only=cache_only, max_pages=max_pages, cap=cap, fetch_details=False):
+        if ev[0] == "done": ids = ev[1]
+    return ids
+
+def stream_search(api_key, user_keyword, order, max_per_query, video_type_label, errors: list | None = None,
+                  max_variants=10, cache_only=False, max_pages=1, cap=UNION_CAP, budget: PageBudget | None = None, fetch_details=True,
+                  timings: list | None = None):
+    """Pipeline streaming: tiap varian (thread sendiri) mengikuti halaman search.list, ID baru dikumpulkan
+    per 50 dan langsung diminta detailnya paralel. Event yang di-yield:
+      ("page", i, n_baru)      halaman varian ke-i tiba
+      ("variant", i, error)    varian ke-i selesai (error None bila sukses)
+      ("videos", records)      satu batch detail selesai
+      ("done", union_ids)      ID gabungan urut varian (first-seen), dipotong `cap`
+    Bila `timings` diberikan, tiap varian menambahkan {query, lang, region, pages, ids, ms, error}.
+    """
+    jobs = search_jobs(user_keyword, max_variants)
+    if not jobs:
+        yield ("done", [])
+        return
+    per_page = search_page_size(max_per_query, max_pages)
+    events = queue.Queue()
+    stop = threading.Event()
+
+    def crawl(i, q, lang, region):
+        pages = n_ids = 0
+        err, t0 = None, time.perf_counter()
+        try:
+            for page_ids in iter_search_pages(api_key, q, order, per_page, video_type_label, lang=lang, region=region,
+                                              max_pages=max_pages, cache_only=cache_only, budget=budget, stop=stop):
+                pages += 1; n_ids += len(page_ids)
+                events.put(("page", i, page_ids))
+        except Exception as e:
+            err = e
+        dt = time.perf_counter() - t0
+        metrics().observe("yt_search_variant_seconds", dt, lang=lang or "-")
+        if timings is not None:
+            timings.append({"query": q, "lang": lang, "region": region, "pages": pages, "ids": n_ids,
+                            "ms": round(dt * 1000, 1), "error": str(err) if err else None})
+        events.put(("variant", i, err))
+
+    per_variant = [[] for _ in jobs]
+    seen, pending_ids = set(), []
+    running, detail_running = len(jobs), 0
+    search_pool = ThreadPoolExecutor(max_workers=min(SEARCH_WORKERS, len(jobs)))
+    detail_pool = ThreadPoolExecutor(max_workers=DETAIL_WORKERS)
+
+    def submit_details(chunk):
+        fut = detail_pool.submit(yt_videos_detail, api_key, chunk, cache_only, errors)
+        fut.add_done_callback(lambda f: events.put(("detail", f)))
+
+    try:
+        for i, (q, lang, region) in enumerate(jobs):
+            search_pool.submit(crawl, i, q, lang, region)
+        while running or detail_running:
+            ev = events.get()
+            if ev[0] == "page":
+                _, i, page_ids = ev
+                per_variant[i].extend(page_ids)
+                new = [v for v in page_ids if v not in seen]
+                seen.update(new)
+                if max_pages > 1 and len(seen) >= cap: stop.set()
+                yield ("page", i, len(new))
+                if fetch_details:
+                    pending_ids.extend(new)
+                    while len(pending_ids) >= DETAIL_BATCH:
+                        submit_details(pending_ids[:DETAIL_BATCH]); del pending_ids[:DETAIL_BATCH]
+                        detail_running += 1
+            elif ev[0] == "variant":
+                _, i, err = ev
+                running -= 1
+                if err is not None and errors is not None: errors.append(f"{jobs[i][0]} ({jobs[i][2]}): {err}")
+                yield ("variant", i, err)
+                if not running and pending_ids and fetch_details:
+                    submit_details(pending_ids); pending_ids = []
+                    detail_running += 1
+            elif ev[0] == "detail":
+                detail_running -= 1
+                try:
+                    yield ("videos", ev[1].result())
+                except Exception as e:
+                    # kegagalan batch sudah dicatat yt_videos_detail sebelum di-raise; hanya error lain yang ditambahkan
+                    if errors is not None and f"videos.list: {e}" not in errors: errors.append(f"videos.list: {e}")
+    finally:
+        stop.set()
+        search_pool.shutdown(wait=False, cancel_futures=True)
+        detail_pool.shutdown(wait=False, cancel_futures=True)
+
+    union, seen_u = [], set()
+    for ids in per_variant:
+        for vid in ids:
+            if vid not in seen_u:
+                union.append(vid); seen_u.add(vid)
+    yield ("done", union[:cap])
+
+def research_keyword(api_key, keyword, sort_option="VPH Tertinggi", video_type_label="Semua", max_per_query=15,
+                     max_pages=1, cap=UNION_CAP, limit=QUOTA_DAILY_DEFAULT):
+    """Pipeline lengkap tanpa UI untuk satu keyword: rencana kuota → stream search+detail → filter → sort.
+    Keyword kosong = trending. Mengembalikan dict {keyword, videos, errors, plan, timings}."""
+    errors, plan, timings = [], None, []
+    with metrics().timer("yt_stage_seconds", stage="search"):
+        if not keyword.strip():
+            videos = get_trending(api_key, max_per_query)
+        else:
+            order = map_sort_option(sort_option)
+            plan = plan_search_budget(api_key, keyword, order, max_per_query, video_type_label, max_pages=max_pages, cap=cap, limit=limit)
+            by_id, union_ids = {}, []
+            for ev in stream_search(api_key, keyword, order, max_per_query, video_type_label, errors=errors,
+                                    max_variants=plan["max_variants"], cache_only=plan["cache_only"],
+                                    max_pages=max_pages, cap=cap, budget=PageBudget(plan["page_budget"]), timings=timings):
+                if ev[0] == "videos": by_id.update((v.id, v) for v in ev[1])
+                elif ev[0] == "done": union_ids = ev[1]
+            videos = [by_id[v] for v in union_ids if v in by_id]
+    videos = collapse_duplicates(videos)
+    term_index(videos)
+    videos = filter_by_video_type(videos, video_type_label)
+    videos = apply_client_sort(videos, sort_option, keyword)
+    return {"keyword": keyword, "videos": videos, "errors": errors, "plan": plan, "timings": timings}
+
+# ---------------- Watchlist (refresh latar belakang) ----------------
+WATCH_TICK = 30  # detik antar pengecekan jadwal worker
+WATCH_RETRY = 300  # detik sebelum entri yang refresh-nya gagal total dicoba lagi
+WATCH_INTERVALS = {"30 menit": 1800, "1 jam": 3600, "3 jam": 3 * 3600, "6 jam": 6 * 3600, "12 jam": 12 * 3600}
+
+class WatchlistStore:
+    """Keyword tersimpan (per API key, di-hash) + hasil refresh terakhirnya (urutan ID saja; detail dari VideoStore).
+    API key sendiri TIDAK pernah disimpan ke disk."""
+    def __init__(self, path):
+        self._lock = threading.Lock()
+        try:
+            self._db = sqlite3.connect(path, check_same_thread=False)
+        except sqlite3.Error:
+            self._db = sqlite3.connect(":memory:", check_same_thread=False)
+        self._db.execute("CREATE TABLE IF NOT EXISTS watchlist (id INTEGER PRIMARY KEY, key_hash TEXT NOT NULL, keyword TEXT NOT NULL, "
+                         "sort_option TEXT NOT NULL, video_type TEXT NOT NULL, interval_s INTEGER NOT NULL, params TEXT NOT NULL, "
+                         "created REAL NOT NULL, UNIQUE (key_hash, keyword, sort_option, video_type))")
+        self._db.execute("CREATE TABLE IF NOT EXISTS watch_results (watch_id INTEGER PRIMARY KEY, refreshed REAL NOT NULL, "
+                         "video_ids TEXT NOT NULL, errors TEXT NOT NULL)")
+        self._db.commit()
+
+    _COLS = "w.id, w.key_hash, w.keyword, w.sort_option, w.video_type, w.interval_s, w.params, r.refreshed, r.video_ids, r.errors"
+
+    @staticmethod
+    def _row(row):
+        wid, kh, kw, so, vt, iv, params, refreshed, ids, errs = row
+        return {"id": wid, "key_hash": kh, "keyword": kw, "sort_option": so, "video_type": vt, "interval_s": iv,
+                "params": json.loads(params), "refreshed": refreshed or 0.0,
+                "video_ids": json.loads(ids) if ids else [], "errors": json.loads(errs) if errs else []}
+
+    def add(self, api_key, keyword, sort_option, video_type, interval_s, **params) -> int:
+        """Simpan/ubah keyword; `params` = max_per_query, max_pages, cap, limit untuk research_keyword."""
+        with self._lock:
+            self._db.execute("INSERT INTO watchlist (key_hash, keyword, sort_option, video_type, interval_s, params, created) "
+                             "VALUES (?,?,?,?,?,?,?) ON CONFLICT(key_hash, keyword, sort_option, video_type) "
+                             "DO UPDATE SET interval_s=excluded.interval_s, params=excluded.params",
+                             (QuotaLedger.key_hash(api_key), keyword.strip(), sort_option, video_type, int(interval_s),
+                              json.dumps(params), time.time()))
+            self._db.commit()
+            row = self._db.execute("SELECT id FROM watchlist WHERE key_hash=? AND keyword=? AND sort_option=? AND video_type=?",
+                                   (QuotaLedger.key_hash(api_key), keyword.strip(), sort_option, video_type)).fetchone()
+        return row[0]
+
+    def remove(self, api_key, watch_id):
+        with self._lock:
+            n = self._db.execute("DELETE FROM watchlist WHERE id=? AND key_hash=?", (watch_id, QuotaLedger.key_hash(api_key))).rowcount
+            if n: self._db.execute("DELETE FROM watch_results WHERE watch_id=?", (watch_id,))
+            self._db.commit()
+
+    def entries(self, api_key=None, key_hashes=None) -> list:
+        """Entri milik satu key, atau milik salah satu `key_hashes` (dipakai worker)."""
+        hashes = [QuotaLedger.key_hash(api_key)] if api_key is not None else list(key_hashes or [])
+        if not hashes: return []
+        with self._lock:
+            rows = self._db.execute(f"SELECT {self._COLS} FROM watchlist w LEFT JOIN watch_results r ON r.watch_id = w.id "
+                                    f"WHERE w.key_hash IN ({','.join('?' * len(hashes))}) ORDER BY w.keyword", hashes).fetchall()
+        return [self._row(r) for r in rows]
+
+    def get(self, watch_id):
+        with self._lock:
+            row = self._db.execute(f"SELECT {self._COLS} FROM watchlist w LEFT JOIN watch_results r ON r.watch_id = w.id "
+                                   "WHERE w.id=?", (watch_id,)).fetchone()
+        return self._row(row) if row else None
+
+    def save_result(self, watch_id, video_ids, errors, refreshed=None):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO watch_results VALUES (?,?,?,?)",
+                             (watch_id, refreshed or time.time(), json.dumps(video_ids), json.dumps(errors, ensure_ascii=False)))
+            self._db.commit()
+
+@process_singleton
+def watchlist_store():
+    return WatchlistStore(CACHE_DB)
+
+class WatchlistWorker:
+    """Satu thread daemon per proses: tiap WATCH_TICK detik me-refresh entri yang jatuh tempo lewat research_keyword
+    (stream search lintas bahasa + videos.list). Key hanya dipegang di memori proses ini — entri milik key yang
+    belum didaftarkan sejak proses start menunggu sampai pemiliknya membuka app."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = {}       # key_hash → api_key (memori saja)
+        self._forced = set()  # watch_id yang diminta refresh manual
+        self._running = set()
+        self._last_error = {}
+        self._failed_at = {}  # watch_id → waktu gagal total terakhir (hasil lama dipertahankan)
+        self._wake = threading.Event()
+        threading.Thread(target=self._loop, name="watchlist-worker", daemon=True).start()
+
+    def register_key(self, api_key):
+        if not api_key: return
+        with self._lock:
+            self._keys[QuotaLedger.key_hash(api_key)] = api_key
+
+    def refresh_now(self, watch_id):
+        with self._lock:
+            self._forced.add(watch_id)
+        self._wake.set()
+
+    def state(self, watch_id) -> str:
+        """'running' | 'queued' | '' untuk tampilan."""
+        with self._lock:
+            if watch_id in self._running: return "running"
+            return "queued" if watch_id in self._forced else ""
+
+    def last_error(self, watch_id):
+        return self._last_error.get(watch_id)
+
+    def _due(self):
+        with self._lock:
+            keys, forced, failed = dict(self._keys), set(self._forced), dict(self._failed_at)
+        now = time.time()
+        return [(e, keys[e["key_hash"]]) for e in watchlist_store().entries(key_hashes=keys)
+                if e["id"] in forced or (now - e["refreshed"] >= e["interval_s"] and now - failed.get(e["id"], 0) >= WATCH_RETRY)]
+
+    def _loop(self):
+        while True:
+            self._wake.wait(WATCH_TICK)
+            self._wake.clear()
+            for entry, api_key in self._due():
+                self.refresh(entry, api_key)
+
+    def refresh(self, entry, api_key):
+        """Refresh satu entri secara sinkron (urut, agar beberapa keyword tidak menghabiskan kuota sekaligus)."""
+        wid = entry["id"]
+        with self._lock:
+            self._running.add(wid)
+        try:
+            with metrics().timer("yt_stage_seconds", stage="watchlist_refresh"):
+                res = research_keyword(api_key, entry["keyword"], entry["sort_option"], entry["video_type"], **entry["params"])
+            if not res["videos"] and res["errors"]:
+                # semua request gagal: jangan timpa hasil lama dengan list kosong, `refreshed` tetap
+                raise RuntimeError(res["errors"][0])
+            watchlist_store().save_result(wid, with_duplicate_ids(res["videos"]), res["errors"])
+            self._last_error.pop(wid, None)
+            self._failed_at.pop(wid, None)
+            metrics().inc("yt_watchlist_refresh_total", outcome="ok")
+        except Exception as e:
+            self._last_error[wid] = str(e)
+            self._failed_at[wid] = time.time()
+            metrics().inc("yt_watchlist_refresh_total", outcome="error")
+        finally:
+            with self._lock:
+                self._running.discard(wid)
+                self._forced.discard(wid)
+
+@process_singleton
+def watchlist_worker():
+    return WatchlistWorker()
+
+def watch_videos(entry) -> list:
+    """Record untuk hasil precomputed sebuah entri, langsung dari VideoStore (tanpa request API)."""
+    return collapse_duplicates(yt_videos_detail("", entry["video_ids"], cache_only=True)) if entry["video_ids"] else []